@@ -1,5 +1,10 @@
 import os
 import uuid
+import json
+import hashlib
+import time
+import random
+import bisect
 import asyncio
 import asyncpg
 import discord
@@ -8,7 +13,20 @@ from dotenv import load_dotenv
 import aiohttp
 from aiohttp import web
 from mctools import RCONClient
+import copy
+import queue
+import logging
+import logging.handlers
+import contextvars
+import sys
+import gzip
+import signal
+import threading
 import traceback
+from collections import Counter, deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from urllib.parse import urlsplit
 from discord.errors import NotFound
 from discord import InteractionResponded
 
@@ -16,45 +34,1078 @@ from discord import InteractionResponded
 load_dotenv()
 
 
+# LOGGING
+# Records are queued from the event loop and formatted/written by a listener thread,
+# so a burst of errors never blocks the loop on stdout.
+log = logging.getLogger("mcdclink")
+
+request_id_var: contextvars.ContextVar[str | None] = contextvars.ContextVar("request_id", default=None)
+interaction_id_var: contextvars.ContextVar[str | None] = contextvars.ContextVar("interaction_id", default=None)
+
+
+class ContextFilter(logging.Filter):
+    # Runs on the calling thread, where the context variables are visible
+    def filter(self, record):
+        record.request_id = request_id_var.get()
+        record.interaction_id = interaction_id_var.get()
+        return True
+
+
+class DedupeFilter(logging.Filter):
+    # Lets one copy of a repeated error through per window and counts the rest
+    def __init__(self, window: float):
+        super().__init__()
+        self.window = window
+        self.seen = {}
+
+    def filter(self, record):
+        if record.levelno < logging.WARNING:
+            return True
+
+        if record.exc_info and record.exc_info[1] is not None:
+            exc = record.exc_info[1]
+            tb = exc.__traceback__
+            while tb is not None and tb.tb_next is not None:
+                tb = tb.tb_next
+            where = (tb.tb_frame.f_code.co_filename, tb.tb_lineno) if tb is not None else None
+            key = (record.name, record.msg, type(exc).__name__, where)
+        else:
+            key = (record.name, record.msg, record.levelno)
+
+        now = time.monotonic()
+        last, suppressed = self.seen.get(key, (None, 0))
+        if last is not None and now - last < self.window:
+            self.seen[key] = (last, suppressed + 1)
+            return False
+
+        if len(self.seen) > 1000:
+            self.seen.clear()
+        self.seen[key] = (now, 0)
+        record.suppressed = suppressed
+        return True
+
+
+class DeferredQueueHandler(logging.handlers.QueueHandler):
+    # Only resolve the message here; traceback formatting happens on the listener thread
+    def prepare(self, record):
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record):
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        for key in ("request_id", "interaction_id"):
+            value = getattr(record, key, None)
+            if value:
+                entry[key] = value
+        suppressed = getattr(record, "suppressed", 0)
+        if suppressed:
+            entry["suppressed"] = suppressed
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+def setup_logging():
+    level = os.getenv("MC_LOG_LEVEL", "INFO").upper()
+    dedupe_window = float(os.getenv("MC_LOG_DEDUPE_SECONDS", "60"))
+
+    stream_handler = logging.StreamHandler()
+    stream_handler.setFormatter(JsonFormatter())
+
+    log_queue = queue.SimpleQueue()
+    queue_handler = DeferredQueueHandler(log_queue)
+    queue_handler.addFilter(ContextFilter())
+    queue_handler.addFilter(DedupeFilter(dedupe_window))
+
+    root = logging.getLogger()
+    root.handlers[:] = [queue_handler]
+    root.setLevel(level)
+
+    listener = logging.handlers.QueueListener(log_queue, stream_handler, respect_handler_level=True)
+    listener.start()
+    return listener
+
+
+@web.middleware
+async def correlation_middleware(request: web.Request, handler):
+    request_id = request.headers.get("X-Request-ID") or uuid.uuid4().hex
+    token = request_id_var.set(request_id)
+    try:
+        response = await handler(request)
+        response.headers["X-Request-ID"] = request_id
+        return response
+    finally:
+        request_id_var.reset(token)
+
+
+class CorrelatedCommandTree(app_commands.CommandTree):
+    # Each interaction runs in its own task, so this tags every log line of the command
+    async def interaction_check(self, interaction: discord.Interaction):
+        interaction_id_var.set(str(interaction.id))
+        return True
+
+
+# EVENT LOOP WATCHDOG
+class LoopWatchdog:
+    """Measures event loop lag and captures the loop thread's stack while it is blocked."""
+
+    def __init__(self, interval: float, stall_threshold: float):
+        self.interval = interval
+        self.stall_threshold = stall_threshold
+        self.loop_thread_id = None
+        self.heartbeat = 0.0
+        self.lag_samples = deque(maxlen=240)
+        self.max_lag = 0.0
+        self.stalls = deque(maxlen=20)
+        self.stall_reported = False
+        self.profile_lock = asyncio.Lock()
+        self.stop_event = threading.Event()
+        self.task = None
+        self.thread = None
+
+    def start(self):
+        self.loop_thread_id = threading.get_ident()
+        self.heartbeat = time.monotonic()
+        self.task = asyncio.create_task(self.tick_loop())
+        self.thread = threading.Thread(target=self.watch, name="loop-watchdog", daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.stop_event.set()
+        if self.task:
+            self.task.cancel()
+
+    async def tick_loop(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            started = loop.time()
+            await asyncio.sleep(self.interval)
+            lag = max(loop.time() - started - self.interval, 0.0)
+            self.heartbeat = time.monotonic()
+            self.lag_samples.append(lag)
+            self.max_lag = max(self.max_lag, lag)
+            if lag > self.stall_threshold:
+                log.warning("Event loop lagged %.3fs", lag)
+
+    # Runs on its own thread so it still sees the loop while a callback is hogging it
+    def watch(self):
+        while not self.stop_event.wait(self.interval):
+            behind = time.monotonic() - self.heartbeat - self.interval
+            if behind <= self.stall_threshold:
+                self.stall_reported = False
+                continue
+            if self.stall_reported:
+                continue
+            self.stall_reported = True
+
+            frame = sys._current_frames().get(self.loop_thread_id)
+            stack = "".join(traceback.format_stack(frame)) if frame is not None else ""
+            self.stalls.append({"at": time.time(), "blocked_for": round(behind, 3), "stack": stack})
+            log.warning("Event loop blocked for %.2fs in:\n%s", behind, stack)
+
+    def _sample_profile_sync(self, seconds: float, sample_interval: float):
+        stacks = Counter()
+        leaves = Counter()
+        samples = 0
+        idle = 0
+        deadline = time.monotonic() + seconds
+        while time.monotonic() < deadline:
+            frame = sys._current_frames().get(self.loop_thread_id)
+            if frame is not None:
+                samples += 1
+                # The loop parked in select() is waiting for I/O, not doing work
+                if frame.f_code.co_name in ("select", "poll", "control") and "selectors" in frame.f_code.co_filename:
+                    idle += 1
+                else:
+                    entries = []
+                    while frame is not None:
+                        code = frame.f_code
+                        entries.append(f"{os.path.basename(code.co_filename)}:{code.co_name}:{frame.f_lineno}")
+                        frame = frame.f_back
+                    entries.reverse()
+                    stacks[";".join(entries)] += 1
+                    leaves[entries[-1]] += 1
+            time.sleep(sample_interval)
+
+        return {
+            "samples": samples,
+            "idle_samples": idle,
+            "busy_ratio": round((samples - idle) / samples, 3) if samples else 0.0,
+            "top_functions": [{"frame": k, "samples": v} for k, v in leaves.most_common(25)],
+            "top_stacks": [{"stack": k, "samples": v} for k, v in stacks.most_common(25)],
+        }
+
+    async def sample_profile(self, seconds: float, sample_interval: float = 0.01):
+        # Use a fresh thread rather than to_thread: a saturated default executor is one of the things we are looking for
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+
+        def worker():
+            try:
+                result = self._sample_profile_sync(seconds, sample_interval)
+            except Exception as e:
+                loop.call_soon_threadsafe(future.set_exception, e)
+            else:
+                loop.call_soon_threadsafe(future.set_result, result)
+
+        threading.Thread(target=worker, name="loop-profiler", daemon=True).start()
+        return await future
+
+    def stats(self):
+        samples = sorted(self.lag_samples)
+        return {
+            "lag_last": round(self.lag_samples[-1], 4) if self.lag_samples else None,
+            "lag_p50": round(samples[len(samples) // 2], 4) if samples else None,
+            "lag_p99": round(samples[min(len(samples) - 1, int(len(samples) * 0.99))], 4) if samples else None,
+            "lag_max": round(self.max_lag, 4),
+            "stalls": list(self.stalls),
+        }
+
+
+# TRAFFIC RECORDER
+class TrafficRecorder:
+    """Appends plugin API traffic to a JSON-lines file (gzip if it ends in .gz) for bench.replay."""
+
+    PATHS = ("/v1/mc-event", "/v1/server-status", "/v1/registration/", "/v1/role/")
+
+    def __init__(self, path: str):
+        self.path = path
+        self.started = time.monotonic()
+        self.queue = queue.SimpleQueue()
+        self.thread = threading.Thread(target=self.write_loop, name="traffic-recorder", daemon=True)
+
+    def start(self):
+        self.thread.start()
+        self.queue.put({"v": 1, "started": time.time()})
+
+    def stop(self):
+        self.queue.put(None)
+        self.thread.join(timeout=5)
+
+    def wants(self, path: str):
+        return path.startswith(self.PATHS)
+
+    def record(self, method: str, path: str, body, status: int, response_body, server_id: str | None = None):
+        entry = {"t": round(time.monotonic() - self.started, 4), "m": method, "p": path, "s": status}
+        if body is not None:
+            entry["b"] = body
+        if server_id:
+            entry["sv"] = server_id
+        # Registration answers let the replayer rebuild which players were linked
+        if response_body is not None and path.startswith("/v1/registration/"):
+            entry["r"] = response_body
+        self.queue.put(entry)
+
+    def write_loop(self):
+        compress = self.path.endswith(".gz")
+        with open(self.path, "ab") as f:
+            batch = []
+            while True:
+                entry = self.queue.get()
+                if entry is not None:
+                    batch.append(json.dumps(entry, separators=(",", ":")) + "\n")
+                if batch and (entry is None or self.queue.empty()):
+                    data = "".join(batch).encode("utf-8")
+                    # Each flush is a complete gzip member, so a killed bot still leaves a readable file
+                    f.write(gzip.compress(data) if compress else data)
+                    f.flush()
+                    batch = []
+                if entry is None:
+                    break
+
+
+@web.middleware
+async def traffic_middleware(request: web.Request, handler):
+    recorder = request.app["recorder"]
+    if not recorder.wants(request.path):
+        return await handler(request)
+
+    body = None
+    if request.can_read_body:
+        raw = await request.read()
+        try:
+            body = json.loads(raw)
+        except ValueError:
+            body = raw.decode("utf-8", errors="replace")
+
+    response = await handler(request)
+
+    response_body = None
+    if isinstance(response, web.Response) and response.body is not None:
+        try:
+            response_body = json.loads(response.body)
+        except (TypeError, ValueError):
+            pass
+    # Handlers resolve the server only after validation, so rejected requests fall back to what the plugin sent
+    server_id = request.get("server_id") or request.headers.get("X-Server-ID") or request.query.get("server")
+    recorder.record(request.method, request.path, body, response.status, response_body, server_id)
+    return response
+
+
+# NAME INDEX
+class PrefixIndex:
+    """Case-insensitive sorted name list; bisect gives prefix lookups without scanning or touching the DB."""
+
+    def __init__(self):
+        self.keys = []
+        self.names = {}
+
+    def __len__(self):
+        return len(self.keys)
+
+    def add(self, name: str):
+        key = name.lower()
+        if key in self.names:
+            self.names[key] = name
+            return
+        bisect.insort(self.keys, key)
+        self.names[key] = name
+
+    def discard(self, name: str):
+        key = name.lower()
+        if self.names.pop(key, None) is None:
+            return
+        i = bisect.bisect_left(self.keys, key)
+        if i < len(self.keys) and self.keys[i] == key:
+            del self.keys[i]
+
+    def replace(self, names):
+        self.names = {name.lower(): name for name in names}
+        self.keys = sorted(self.names)
+
+    def canonical(self, name: str):
+        return self.names.get(name.lower(), name)
+
+    def complete(self, prefix: str, limit: int = 25):
+        prefix = prefix.lower()
+        start = bisect.bisect_left(self.keys, prefix)
+        results = []
+        for key in self.keys[start:start + limit]:
+            if not key.startswith(prefix):
+                break
+            results.append(self.names[key])
+        return results
+
+
+class RegisteredNames:
+    """Linked accounts as uuid -> current name, plus renames not yet written to users.current_username."""
+
+    def __init__(self):
+        self.by_uuid = {}
+        self.by_name = {}  # lowercase name -> uuid
+        # Autocomplete source, kept in step with by_uuid
+        self.index = PrefixIndex()
+        self.dirty = {}
+
+    def __contains__(self, minecraft_uuid: str):
+        return minecraft_uuid in self.by_uuid
+
+    def __len__(self):
+        return len(self.by_uuid)
+
+    def load(self, rows):
+        self.by_uuid = dict(rows)
+        self.by_name = {name.lower(): minecraft_uuid for minecraft_uuid, name in self.by_uuid.items()}
+        self.index.replace(self.by_uuid.values())
+
+    def name_for(self, minecraft_uuid: str):
+        return self.by_uuid.get(minecraft_uuid)
+
+    def uuid_for(self, name: str):
+        return self.by_name.get(name.lower())
+
+    def link(self, minecraft_uuid: str, name: str):
+        """A registration that is already in the DB."""
+        self._set(minecraft_uuid, name)
+        self.dirty.pop(minecraft_uuid, None)
+
+    def observe(self, minecraft_uuid: str, name: str):
+        """Feed the plugin's uuid/name pair; queues a write and returns True if a linked player was renamed."""
+        current = self.by_uuid.get(minecraft_uuid)
+        if current is None or current == name:
+            return False
+        self._set(minecraft_uuid, name)
+        self.dirty[minecraft_uuid] = name
+        return True
+
+    def take_dirty(self):
+        dirty, self.dirty = self.dirty, {}
+        return dirty
+
+    def requeue(self, batch):
+        # A rename observed after the failed flush wins over the batch
+        for minecraft_uuid, name in batch.items():
+            self.dirty.setdefault(minecraft_uuid, name)
+
+    def _set(self, minecraft_uuid: str, name: str):
+        old = self.by_uuid.get(minecraft_uuid)
+        if old is not None and old != name and self.by_name.get(old.lower()) == minecraft_uuid:
+            del self.by_name[old.lower()]
+            self.index.discard(old)
+        self.by_uuid[minecraft_uuid] = name
+        self.by_name[name.lower()] = minecraft_uuid
+        self.index.add(name)
+
+
+# UPSTREAM HTTP
+class UpstreamError(Exception):
+    pass
+
+
+class CircuitOpenError(UpstreamError):
+    pass
+
+
+class CircuitBreaker:
+    """Opens after consecutive failures, then lets a single trial call through once reset_timeout has passed."""
+
+    def __init__(self, name: str, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self.trial_in_flight = False
+
+    @property
+    def state(self):
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return "half_open"
+        return "open"
+
+    def allow(self):
+        state = self.state
+        if state == "closed":
+            return True
+        if state == "half_open" and not self.trial_in_flight:
+            self.trial_in_flight = True
+            return True
+        return False
+
+    def record_success(self):
+        if self.opened_at is not None:
+            log.info("Upstream %s recovered, closing circuit", self.name)
+        self.failures = 0
+        self.opened_at = None
+        self.trial_in_flight = False
+
+    def record_failure(self):
+        self.failures += 1
+        if self.trial_in_flight or (self.opened_at is None and self.failures >= self.failure_threshold):
+            if self.opened_at is None:
+                log.warning("Upstream %s failing, opening circuit for %.0fs", self.name, self.reset_timeout)
+            self.opened_at = time.monotonic()
+        self.trial_in_flight = False
+
+
+class UpstreamClient:
+    """One ClientSession per upstream, with per-host circuit breakers, jittered retries, hedging and in-flight dedupe."""
+
+    def __init__(
+        self,
+        name: str,
+        *,
+        timeout: float = 6.0,
+        limit_per_host: int = 8,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+        retry_backoff: float = 0.2,
+    ):
+        self.name = name
+        self.timeout = timeout
+        self.limit_per_host = limit_per_host
+        self.retry_backoff = retry_backoff
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        # host:port -> breaker, so one dead status endpoint doesn't block the other servers' hosts
+        self.breakers: dict[str, CircuitBreaker] = {}
+        self.session: aiohttp.ClientSession | None = None
+        # (url, timeout, retries, hedge_after) -> shared request
+        self.inflight: dict[tuple, asyncio.Task] = {}
+
+    def start(self):
+        connector = aiohttp.TCPConnector(
+            limit_per_host=self.limit_per_host,
+            ttl_dns_cache=300,
+            keepalive_timeout=30,
+        )
+        self.session = aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=self.timeout),
+        )
+
+    async def close(self):
+        if self.session:
+            await self.session.close()
+
+    def breaker_for(self, url: str):
+        parts = urlsplit(url)
+        host = f"{parts.hostname}:{parts.port or (443 if parts.scheme == 'https' else 80)}"
+        breaker = self.breakers.get(host)
+        if breaker is None:
+            breaker = CircuitBreaker(f"{self.name} ({host})", self.failure_threshold, self.reset_timeout)
+            self.breakers[host] = breaker
+        return breaker
+
+    async def get_json(self, url: str, *, timeout: float | None = None, retries: int = 0, hedge_after: float | None = None):
+        """Returns (status, data). Non-200 statuses below 500 come back as (status, None); outages raise UpstreamError."""
+        if not self.session:
+            raise UpstreamError(f"{self.name} client not started")
+
+        # Concurrent callers for the same URL share one request (panel + web-status polls hit the same document).
+        # The settings are part of the key, so a user-facing hedged call never waits on a background poll or vice versa.
+        key = (url, timeout, retries, hedge_after)
+        task = self.inflight.get(key)
+        if task is None:
+            breaker = self.breaker_for(url)
+            if not breaker.allow():
+                raise CircuitOpenError(f"{breaker.name} circuit open")
+            task = asyncio.create_task(self._fetch(breaker, url, timeout, retries, hedge_after))
+            self.inflight[key] = task
+            task.add_done_callback(lambda t: self._finish(key, breaker, t))
+        return await asyncio.shield(task)
+
+    def _finish(self, key: tuple, breaker: CircuitBreaker, task: asyncio.Task):
+        if self.inflight.get(key) is task:
+            del self.inflight[key]
+        if task.cancelled():
+            breaker.trial_in_flight = False
+        else:
+            task.exception()
+
+    async def _fetch(self, breaker: CircuitBreaker, url: str, timeout: float | None, retries: int, hedge_after: float | None):
+        attempt = 0
+        while True:
+            try:
+                result = await self._hedged(url, timeout, hedge_after)
+            except UpstreamError:
+                breaker.record_failure()
+                if attempt >= retries or breaker.state != "closed":
+                    raise
+                # Full jitter so a fleet of callers doesn't retry in lockstep
+                await asyncio.sleep(random.uniform(0, min(2.0, self.retry_backoff * (2 ** attempt))))
+                attempt += 1
+                continue
+            breaker.record_success()
+            return result
+
+    async def _hedged(self, url: str, timeout: float | None, hedge_after: float | None):
+        first = asyncio.create_task(self._attempt(url, timeout))
+        if hedge_after is None:
+            return await first
+
+        done, _ = await asyncio.wait({first}, timeout=hedge_after)
+        if done:
+            return first.result()
+
+        # First attempt is slow: race a second one and keep whichever answers first
+        pending = {first, asyncio.create_task(self._attempt(url, timeout))}
+        error = None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def _attempt(self, url: str, timeout: float | None):
+        # Passing timeout=None to aiohttp disables the limit entirely, so fall back to the client's own
+        req_timeout = aiohttp.ClientTimeout(total=timeout or self.timeout)
+        try:
+            async with self.session.get(url, timeout=req_timeout) as response:
+                if response.status >= 500 or response.status == 429:
+                    raise UpstreamError(f"{self.name} returned {response.status}")
+                if response.status != 200:
+                    return response.status, None
+                return 200, await response.json(content_type=None)
+        except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
+            raise UpstreamError(f"{self.name} request failed: {e!r}") from e
+
+
+# SERVERS
+class RconPool:
+    """Logged-in RCON connections for one server, reused by worker threads instead of a fresh login per lookup."""
+
+    def __init__(self, host: str, port: int, password: str, size: int = 2):
+        self.host = host
+        self.port = port
+        self.password = password
+        self.idle = []
+        self.lock = threading.Lock()
+        self.slots = threading.BoundedSemaphore(size)
+        self.objectives_ready = False
+
+    def _connect(self):
+        client = RCONClient(self.host, port=self.port)
+        if not client.login(self.password):
+            self._discard(client)
+            raise ConnectionError(f"RCON login refused by {self.host}:{self.port}")
+        # Objectives live in the world, so creating them once per pool is enough
+        if not self.objectives_ready:
+            client.command("scoreboard objectives add dclink_playtime minecraft.custom:minecraft.play_time")
+            client.command("scoreboard objectives add dclink_deaths minecraft.custom:minecraft.deaths")
+            self.objectives_ready = True
+        return client
+
+    def _discard(self, client):
+        try:
+            client.stop()
+        except Exception:
+            pass
+
+    def run(self, commands):
+        with self.slots:
+            with self.lock:
+                client = self.idle.pop() if self.idle else None
+            pooled = client is not None
+            try:
+                if client is None:
+                    client = self._connect()
+                responses = [client.command(command) for command in commands]
+            except Exception:
+                if client is not None:
+                    self._discard(client)
+                if not pooled:
+                    raise
+                # A pooled connection may have gone stale (server restart); retry once on a fresh one
+                client = self._connect()
+                try:
+                    responses = [client.command(command) for command in commands]
+                except Exception:
+                    self._discard(client)
+                    raise
+            with self.lock:
+                self.idle.append(client)
+            return responses
+
+    def close(self):
+        with self.lock:
+            clients, self.idle = self.idle, []
+        for client in clients:
+            self._discard(client)
+
+
+class ServerState:
+    """Everything the bot tracks for one Minecraft server."""
+
+    def __init__(
+        self,
+        server_id: str,
+        *,
+        name: str = "",
+        query_host: str = "127.0.0.1",
+        query_port: int = 25565,
+        status_url: str = "",
+        server_address: str = "",
+        rcon_host: str = "",
+        rcon_port: int = 25575,
+        rcon_password: str = "",
+        panel_message_id: int | None = None,
+    ):
+        self.server_id = server_id
+        self.name = name or server_id
+        self.query_host = query_host
+        self.query_port = query_port
+        self.status_url = status_url
+        self.server_address = server_address
+        self.rcon_host = rcon_host
+        self.rcon_port = rcon_port
+        self.rcon_password = rcon_password
+        self.rcon = RconPool(rcon_host, rcon_port, rcon_password) if rcon_host and rcon_password else None
+        self.panel_message_id = panel_message_id
+        self.online_players = set()
+        # uuid -> name for players announced by the plugin; profile refreshes key on this
+        self.online_uuids = {}
+        # Autocomplete source, kept in step with online_players
+        self.online_index = PrefixIndex()
+        # What the panel shows (mcstatus list, else online_players), kept sorted between renders
+        self.panel_roster = RosterSections()
+        self.last_server_status = {"ping": None, "version": None, "day": None, "time": None}
+        self.next_poll = 0.0
+
+    @property
+    def url(self):
+        if self.status_url:
+            return self.status_url
+        return f"https://api.mcstatus.io/v2/status/java/{self.query_host}:{self.query_port}"
+
+    def player_joined(self, name: str, minecraft_uuid: str | None = None):
+        self.online_players.add(name)
+        self.online_index.add(name)
+        if minecraft_uuid:
+            self.online_uuids[minecraft_uuid] = name
+
+    def player_left(self, name: str, minecraft_uuid: str | None = None):
+        self.online_players.discard(name)
+        self.online_index.discard(name)
+        if minecraft_uuid:
+            self.online_uuids.pop(minecraft_uuid, None)
+
+    def set_online_players(self, names, uuids=None):
+        self.online_players = set(names)
+        self.online_index.replace(self.online_players)
+        self.online_uuids = {
+            minecraft_uuid: name for minecraft_uuid, name in (uuids or {}).items() if name in self.online_players
+        }
+
+
+def load_servers_from_env():
+    """MC_SERVERS=survival,creative reads MC_SERVER_<ID>_* settings; without it the legacy single-server vars apply."""
+
+    def env_int(key: str, default: int | None):
+        value = os.getenv(key, "").strip()
+        return int(value) if value.isdigit() else default
+
+    server_ids = [s.strip() for s in os.getenv("MC_SERVERS", "").split(",") if s.strip()]
+    if not server_ids:
+        return {
+            "default": ServerState(
+                "default",
+                query_host=os.getenv("MC_QUERY_HOST", "127.0.0.1"),
+                query_port=env_int("MC_QUERY_PORT", 25565),
+                status_url=os.getenv("MC_STATUS_URL", "").strip(),
+                server_address=os.getenv("MC_SERVER_ADDRESS", "").strip(),
+                rcon_host=os.getenv("RCON_HOST", ""),
+                rcon_port=env_int("RCON_PORT", 25575),
+                rcon_password=os.getenv("RCON_PASSWORD", ""),
+                panel_message_id=env_int("MC_PANEL_MESSAGE_ID", None),
+            )
+        }
+
+    servers = {}
+    for server_id in server_ids:
+        prefix = f"MC_SERVER_{server_id.upper()}_"
+        servers[server_id] = ServerState(
+            server_id,
+            name=os.getenv(prefix + "NAME", "").strip(),
+            query_host=os.getenv(prefix + "QUERY_HOST", "127.0.0.1"),
+            query_port=env_int(prefix + "QUERY_PORT", 25565),
+            status_url=os.getenv(prefix + "STATUS_URL", "").strip(),
+            server_address=os.getenv(prefix + "ADDRESS", "").strip(),
+            rcon_host=os.getenv(prefix + "RCON_HOST", ""),
+            rcon_port=env_int(prefix + "RCON_PORT", 25575),
+            rcon_password=os.getenv(prefix + "RCON_PASSWORD", ""),
+            panel_message_id=env_int(prefix + "PANEL_MESSAGE_ID", None),
+        )
+    return servers
+
+
+class Panel:
+    """One Discord panel message covering one server, or all of them in combined mode."""
+
+    def __init__(self, key: str, server_ids, message_id: int | None = None):
+        self.key = key
+        self.server_ids = list(server_ids)
+        self.message_id = message_id
+        self.message = None  # cached discord.Message
+        self.view = None  # PanelView, registered as persistent at startup
+        self.view_attached = False  # messages posted by older versions lack the Browse button
+        self.dirty = False
+        self.dirty_since = 0.0
+        self.last_edit = 0.0
+
+
+# PANEL ROSTER
+class RosterSections:
+    """Sorted online names split into chunks that each fit one embed field.
+
+    A join or leave lands in a single chunk, so only that chunk's field text is rebuilt.
+    """
+
+    def __init__(self, max_chars: int = 1000):
+        self.max_chars = max_chars
+        self.names = {}     # lowercase key -> display name
+        self.chunks = []    # sorted key lists
+        self.maxes = []     # last key of each chunk, for bisect
+        self.sizes = []     # rendered length of each chunk
+        self.rendered = []  # cached field value per chunk, None when stale
+
+    def __len__(self):
+        return len(self.names)
+
+    @staticmethod
+    def entry_size(name: str):
+        # "🟢 name, " with the emoji counted as two characters, as Discord does
+        return len(name) + 5
+
+    def add(self, name: str):
+        key = name.lower()
+        if key in self.names:
+            if self.names[key] != name:
+                i = self._chunk_of(key)
+                self.sizes[i] += self.entry_size(name) - self.entry_size(self.names[key])
+                self.names[key] = name
+                self.rendered[i] = None
+            return
+        self.names[key] = name
+
+        if not self.chunks:
+            self.chunks.append([key])
+            self.maxes.append(key)
+            self.sizes.append(self.entry_size(name))
+            self.rendered.append(None)
+            return
+
+        i = min(bisect.bisect_left(self.maxes, key), len(self.chunks) - 1)
+        chunk = self.chunks[i]
+        bisect.insort(chunk, key)
+        self.maxes[i] = chunk[-1]
+        self.sizes[i] += self.entry_size(name)
+        self.rendered[i] = None
+        if self.sizes[i] > self.max_chars and len(chunk) > 1:
+            self._split(i)
+
+    def discard(self, name: str):
+        key = name.lower()
+        if key not in self.names:
+            return
+        i = self._chunk_of(key)
+        chunk = self.chunks[i]
+        del chunk[bisect.bisect_left(chunk, key)]
+        self.sizes[i] -= self.entry_size(self.names.pop(key))
+        if not chunk:
+            self._remove(i)
+            return
+        self.maxes[i] = chunk[-1]
+        self.rendered[i] = None
+        # Fold a shrunken chunk into its neighbour so the panel doesn't fill with half-empty fields
+        if i + 1 < len(self.chunks) and self.sizes[i] + self.sizes[i + 1] <= self.max_chars // 2:
+            self._merge(i)
+        elif i > 0 and self.sizes[i - 1] + self.sizes[i] <= self.max_chars // 2:
+            self._merge(i - 1)
+
+    def sync(self, names):
+        """Apply the difference between the current roster and names."""
+        names = set(names)
+        current = set(self.names.values())
+        if names == current:
+            return
+        for name in current - names:
+            self.discard(name)
+        for name in names - current:
+            self.add(name)
+
+    def sections(self):
+        for i, value in enumerate(self.rendered):
+            if value is None:
+                self.rendered[i] = ", ".join(f"🟢 {self.names[key]}" for key in self.chunks[i])
+        return list(self.rendered)
+
+    def _chunk_of(self, key: str):
+        return bisect.bisect_left(self.maxes, key)
+
+    def _split(self, i: int):
+        chunk = self.chunks[i]
+        half = len(chunk) // 2
+        left, right = chunk[:half], chunk[half:]
+        self.chunks[i:i + 1] = [left, right]
+        self.maxes[i:i + 1] = [left[-1], right[-1]]
+        self.sizes[i:i + 1] = [sum(self.entry_size(self.names[k]) for k in part) for part in (left, right)]
+        self.rendered[i:i + 1] = [None, None]
+
+    def _merge(self, i: int):
+        self.chunks[i:i + 2] = [self.chunks[i] + self.chunks[i + 1]]
+        self.maxes[i:i + 2] = [self.chunks[i][-1]]
+        self.sizes[i:i + 2] = [self.sizes[i] + self.sizes[i + 1]]
+        self.rendered[i:i + 2] = [None]
+
+    def _remove(self, i: int):
+        del self.chunks[i], self.maxes[i], self.sizes[i], self.rendered[i]
+
+
+class RosterPagesView(discord.ui.View):
+    """Ephemeral pager over a snapshot of roster fields; paging edits the user's copy, never the panel."""
+
+    def __init__(self, title: str, pages):
+        super().__init__(timeout=300)
+        self.title = title
+        self.pages = pages
+        self.page = 0
+        self.sync_buttons()
+
+    def embed(self):
+        embed = discord.Embed(title=self.title, color=discord.Color.blurple())
+        for name, value in self.pages[self.page]:
+            embed.add_field(name=name, value=value, inline=False)
+        embed.set_footer(text=f"Page {self.page + 1}/{len(self.pages)}")
+        return embed
+
+    def sync_buttons(self):
+        self.previous_page.disabled = self.page == 0
+        self.next_page.disabled = self.page >= len(self.pages) - 1
+
+    @discord.ui.button(label="◀ Previous", style=discord.ButtonStyle.secondary)
+    async def previous_page(self, interaction: discord.Interaction, button: discord.ui.Button):
+        self.page = max(0, self.page - 1)
+        self.sync_buttons()
+        await interaction.response.edit_message(embed=self.embed(), view=self)
+
+    @discord.ui.button(label="Next ▶", style=discord.ButtonStyle.secondary)
+    async def next_page(self, interaction: discord.Interaction, button: discord.ui.Button):
+        self.page = min(len(self.pages) - 1, self.page + 1)
+        self.sync_buttons()
+        await interaction.response.edit_message(embed=self.embed(), view=self)
+
+
+class PanelView(discord.ui.View):
+    """Buttons under a panel. Persistent, so Browse keeps working on panels posted before a restart."""
+
+    def __init__(self, client, panel):
+        super().__init__(timeout=None)
+        self.client = client
+        self.panel = panel
+        self.add_item(
+            discord.ui.Button(
+                label="Visit Website",
+                url="https://mc.marsphobos.com/",
+                style=discord.ButtonStyle.link,
+            )
+        )
+        browse = discord.ui.Button(
+            label="Browse players",
+            style=discord.ButtonStyle.secondary,
+            custom_id=f"mcdclink:roster:{panel.key}",
+        )
+        browse.callback = self.browse
+        self.add_item(browse)
+
+    async def browse(self, interaction: discord.Interaction):
+        pages = self.client.build_roster_pages(self.panel)
+        if not pages:
+            await interaction.response.send_message("Nobody is online right now.", ephemeral=True)
+            return
+        view = RosterPagesView("Online players", pages)
+        if len(pages) == 1:
+            await interaction.response.send_message(embed=view.embed(), ephemeral=True)
+        else:
+            await interaction.response.send_message(embed=view.embed(), view=view, ephemeral=True)
+
+
 # MAIN CLASS
 class MCRegistrationClient(discord.Client):
     def __init__(self, *, intents: discord.Intents):
         super().__init__(intents=intents)
         self.pool = None
-        self.tree = app_commands.CommandTree(self)
+        self.tree = CorrelatedCommandTree(self)
         self.api_runner = None
         self.log_channel_id = None
         self.log_channel = None
         self.guild_id = None
-        self.online_players = set()
-        self.query_host = "127.0.0.1"
-        self.query_port = 25565
-        self.status_url = ""
-        self.panel_message_id = None
-        self.panel_message = None  # cached discord.Message
-        self.last_server_status = {"ping": None, "version": None, "day": None, "time": None}
+        # server_id -> ServerState; the first one answers requests that don't name a server
+        self.servers: dict[str, ServerState] = {}
+        self.panels: list[Panel] = []
+        self.panel_mode = os.getenv("MC_PANEL_MODE", "per-server").strip()
+        # Linked accounts by uuid; renames seen on join are flushed to the DB in batches
+        self.registered = RegisteredNames()
+        self.username_flush_interval = float(os.getenv("MC_USERNAME_FLUSH_SECONDS", "5"))
+        self.username_task = None
         self.panel_task = None
-        self.server_address = ""
-        self.rcon_host = ""
-        self.rcon_port = 25575
-        self.rcon_password = ""
         self.profile_task = None
+        self.backend_task = None
+        self.db_ready = False
+        self.command_hash_path = os.getenv("MC_COMMAND_HASH_FILE", ".command_tree.sha256")
+
+        # Warm-restart snapshot of roster, status and panel message
+        self.state_path = os.getenv("MC_STATE_FILE", ".bot_state.json")
+        self.state_max_age = float(os.getenv("MC_STATE_MAX_AGE", "600"))
+        self.state_interval = 15.0
+        self.state_task = None
+        self.last_state_json = None
+        self.last_state_save = 0.0
+
+        self.watchdog = LoopWatchdog(
+            interval=float(os.getenv("MC_LOOP_WATCHDOG_INTERVAL", "0.5")),
+            stall_threshold=float(os.getenv("MC_LOOP_STALL_SECONDS", "0.25")),
+        )
+        # Explicit pool for asyncio.to_thread (RCON) so its saturation can be reported
+        self.executor = ThreadPoolExecutor(
+            max_workers=int(os.getenv("MC_THREAD_POOL_SIZE", "8")),
+            thread_name_prefix="mcdclink-worker",
+        )
+
+        # Optional capture of plugin traffic for bench/replay.py
+        record_path = os.getenv("MC_TRAFFIC_RECORD_FILE", "").strip()
+        self.traffic_recorder = TrafficRecorder(record_path) if record_path else None
 
         # DO NOT use self.http (discord.py uses that internally)
-        self.aiohttp_session: aiohttp.ClientSession | None = None
+        # One client per upstream so a slow mcstatus can't eat Mojang's connections (and vice versa)
+        self.mcstatus = UpstreamClient("mcstatus", timeout=6.0, limit_per_host=4)
+        self.mojang = UpstreamClient("mojang", timeout=6.0, limit_per_host=8)
 
         # Panel update controls (prevents “Can't keep up”)
         self.panel_lock = asyncio.Lock()
-        self.panel_update_scheduled = False
-        self.last_panel_update = 0.0
-        self.min_panel_interval = 10.0      # seconds between Discord edits
+        self.panel_wakeup = asyncio.Event()
+        self.last_panel_edit = 0.0
+        self.min_panel_interval = 10.0      # seconds between edits of the same panel
+        self.panel_edit_spacing = 1.0       # seconds between any two Discord edits
         self.panel_debounce_delay = 2.0     # seconds to coalesce bursts
+        self.panel_poll_interval = 30.0     # seconds between status polls of one server
+
+        # Discord caps a message at 25 fields per embed and 6000 characters across its embeds
+        self.panel_max_fields = 25
+        self.panel_char_limit = 5900
+        self.roster_page_sections = 4  # fields per page in the Browse pager
+
+    # Bring the DB and HTTP API up alongside the Discord login so the mod gets answers during gateway startup
+    async def start(self, token: str, *, reconnect: bool = True):
+        if self.watchdog.task is None:
+            asyncio.get_running_loop().set_default_executor(self.executor)
+            self.watchdog.start()
+        if self.backend_task is None:
+            self.backend_task = asyncio.create_task(self.start_backend())
+        await super().start(token, reconnect=reconnect)
 
-        # Cache the view so we don't recreate it on every edit
-        self.panel_view: discord.ui.View | None = None
-
-    # CONNECT TO DB
     async def setup_hook(self):
+        if self.backend_task is None:
+            self.backend_task = asyncio.create_task(self.start_backend())
+
+        # Command sync only needs Discord, so it runs while the DB side finishes
+        await asyncio.gather(self.backend_task, self.sync_commands_if_changed())
+
+        # Persistent views, so Browse works on panels posted before this start
+        for panel in self.panels:
+            self.add_view(self.panel_view_for(panel))
+
+        self.panel_task = asyncio.create_task(self.panel_scheduler_loop())
+        self.profile_task = asyncio.create_task(self.profile_refresh_loop())
+        self.state_task = asyncio.create_task(self.state_snapshot_loop())
+        self.username_task = asyncio.create_task(self.username_flush_loop())
+
+    async def start_backend(self):
+        log_channel = os.getenv("MC_LOG_CHANNEL_ID", "").strip()
+        if log_channel.isdigit():
+            self.log_channel_id = int(log_channel)
+
+        guild_id = os.getenv("MC_GUILD_ID", "").strip()
+        if guild_id.isdigit():
+            self.guild_id = int(guild_id)
+
+        self.build_panels()
+
+        # Before the API starts, so the first web-status/panel answers are warm
+        await asyncio.to_thread(self.load_state_snapshot)
+
+        # Keep total a bit higher for user commands, but we'll override with shorter per-request timeouts for background work.
+        self.mcstatus.start()
+        self.mojang.start()
+
+        # CONNECT TO DB
         self.pool = await asyncpg.create_pool(
             host=os.getenv("DB_HOST"),
             port=int(os.getenv("DB_PORT")),
@@ -63,6 +1114,15 @@ class MCRegistrationClient(discord.Client):
             password=os.getenv("DB_PASSWORD"),
         )
 
+        # Schema first: on a fresh DB the plugin's first lookups would otherwise 500 and kick players.
+        # The DDL is a few milliseconds, so the API still comes up well before the gateway is ready.
+        await self.create_schema()
+        # Before the API too, so a renamed player's first join event finds their link
+        await self.load_registered_names()
+        await self.start_api_server()
+        self.db_ready = True
+
+    async def create_schema(self):
         async with self.pool.acquire() as conn:
             await conn.execute(
                 """
@@ -86,38 +1146,205 @@ class MCRegistrationClient(discord.Client):
                 """
             )
 
-        log_channel = os.getenv("MC_LOG_CHANNEL_ID", "").strip()
-        if log_channel.isdigit():
-            self.log_channel_id = int(log_channel)
+    async def load_registered_names(self):
+        async with self.pool.acquire() as conn:
+            rows = await conn.fetch("SELECT minecraft_uuid, current_username FROM users")
+        self.registered.load((row["minecraft_uuid"], row["current_username"]) for row in rows)
 
-        guild_id = os.getenv("MC_GUILD_ID", "").strip()
-        if guild_id.isdigit():
-            self.guild_id = int(guild_id)
+    async def flush_usernames(self):
+        batch = self.registered.take_dirty()
+        if not batch:
+            return
+        try:
+            async with self.pool.acquire() as conn:
+                await conn.executemany(
+                    "UPDATE users SET current_username = $2 WHERE minecraft_uuid = $1",
+                    list(batch.items()),
+                )
+        except Exception:
+            self.registered.requeue(batch)
+            raise
+        log.info("Updated %d renamed usernames", len(batch))
 
-        panel_message = os.getenv("MC_PANEL_MESSAGE_ID", "").strip()
-        if panel_message.isdigit():
-            self.panel_message_id = int(panel_message)
+    async def username_flush_loop(self):
+        while True:
+            await asyncio.sleep(self.username_flush_interval)
+            try:
+                await self.flush_usernames()
+            except Exception:
+                log.exception("Username flush failed")
 
-        # Reuse one ClientSession for all HTTP calls
-        # Keep total a bit higher for user commands, but we'll override with shorter per-request timeouts for background work.
-        self.aiohttp_session = aiohttp.ClientSession(
-            timeout=aiohttp.ClientTimeout(total=6)
+    def command_tree_fingerprint(self):
+        payload = sorted(
+            (command.to_dict(self.tree) for command in self.tree.get_commands()),
+            key=lambda c: c["name"],
         )
+        # Include the application so switching bot tokens still triggers a sync
+        encoded = json.dumps([self.application_id, payload], sort_keys=True, separators=(",", ":"), default=str)
+        return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
 
-        await self.start_api_server()
+    # Global sync is rate limited, so only do it when the command definitions actually changed
+    async def sync_commands_if_changed(self):
+        fingerprint = self.command_tree_fingerprint()
+
+        try:
+            with open(self.command_hash_path, "r", encoding="utf-8") as f:
+                previous = f.read().strip()
+        except OSError:
+            previous = ""
+
+        if previous == fingerprint:
+            log.info("Slash commands unchanged, skipping sync.")
+            return
 
         await self.tree.sync()
-        print("Synced Slash Commands.")
+        log.info("Synced Slash Commands.")
 
-        self.panel_task = asyncio.create_task(self.panel_loop())
-        self.profile_task = asyncio.create_task(self.profile_refresh_loop())
+        try:
+            tmp_path = f"{self.command_hash_path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write(fingerprint)
+            os.replace(tmp_path, self.command_hash_path)
+        except OSError:
+            log.exception("Could not store command tree fingerprint")
+
+    @property
+    def default_server(self):
+        return next(iter(self.servers.values()))
+
+    def build_panels(self):
+        if self.panel_mode == "combined" and len(self.servers) > self.panel_max_fields:
+            # Not even one summary field per server would fit in a single embed
+            log.warning(
+                "MC_PANEL_MODE=combined supports at most %d servers, got %d; using one panel per server.",
+                self.panel_max_fields,
+                len(self.servers),
+            )
+            self.panel_mode = "per-server"
+        if self.panel_mode == "combined":
+            message_id = os.getenv("MC_PANEL_MESSAGE_ID", "").strip()
+            message_id = int(message_id) if message_id.isdigit() else self.default_server.panel_message_id
+            self.panels = [Panel("combined", self.servers, message_id)]
+        else:
+            self.panels = [
+                Panel(f"server:{server.server_id}", [server.server_id], server.panel_message_id)
+                for server in self.servers.values()
+            ]
+
+    def build_state_snapshot(self):
+        return {
+            "servers": {
+                server.server_id: {
+                    "online_players": sorted(server.online_players),
+                    "online_uuids": dict(server.online_uuids),
+                    "last_server_status": dict(server.last_server_status),
+                }
+                for server in self.servers.values()
+            },
+            "panels": {panel.key: panel.message_id for panel in self.panels},
+        }
+
+    def load_state_snapshot(self):
+        try:
+            with open(self.state_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+
+        if not isinstance(data, dict):
+            return
+
+        # Single-server snapshots from before multi-server support
+        if "servers" not in data:
+            data = {
+                "saved_at": data.get("saved_at"),
+                "servers": {self.default_server.server_id: data},
+                "panels": {self.panels[0].key: data.get("panel_message_id")},
+            }
+
+        # Panel messages stay valid across restarts; update_panel re-posts if one was deleted
+        panel_ids = data.get("panels")
+        if isinstance(panel_ids, dict):
+            for panel in self.panels:
+                message_id = panel_ids.get(panel.key)
+                if isinstance(message_id, int):
+                    panel.message_id = message_id
+
+        saved_at = data.get("saved_at")
+        if not isinstance(saved_at, (int, float)) or time.time() - saved_at > self.state_max_age:
+            log.info("State snapshot is stale, only restoring panel messages.")
+            return
+
+        restored = 0
+        server_states = data.get("servers")
+        if not isinstance(server_states, dict):
+            return
+        for server_id, state in server_states.items():
+            server = self.servers.get(server_id)
+            if server is None or not isinstance(state, dict):
+                continue
+
+            players = state.get("online_players")
+            uuids = state.get("online_uuids")
+            if isinstance(players, list):
+                server.set_online_players(
+                    (name for name in players if isinstance(name, str)),
+                    uuids if isinstance(uuids, dict) else None,
+                )
+                restored += len(server.online_players)
+
+            status = state.get("last_server_status")
+            if isinstance(status, dict):
+                for key in server.last_server_status:
+                    if key in status:
+                        server.last_server_status[key] = status[key]
+
+        log.info("Restored state snapshot (%d online players).", restored)
+
+    def _write_state_snapshot_sync(self, encoded: str):
+        tmp_path = f"{self.state_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(encoded)
+        os.replace(tmp_path, self.state_path)
+
+    async def save_state_snapshot(self):
+        snapshot = self.build_state_snapshot()
+        state_json = json.dumps(snapshot, sort_keys=True)
+        now = time.time()
+        # Skip the disk write when nothing changed, but refresh saved_at before it would count as stale
+        if state_json == self.last_state_json and now - self.last_state_save < self.state_max_age / 2:
+            return
+
+        snapshot["saved_at"] = now
+        try:
+            await asyncio.to_thread(self._write_state_snapshot_sync, json.dumps(snapshot, sort_keys=True))
+        except OSError:
+            log.exception("Could not write state snapshot")
+            return
+        self.last_state_json = state_json
+        self.last_state_save = now
+
+    async def state_snapshot_loop(self):
+        while True:
+            await asyncio.sleep(self.state_interval)
+            try:
+                await self.save_state_snapshot()
+            except Exception:
+                log.exception("State snapshot failed")
 
     async def start_api_server(self):
         api_key = os.getenv("MC_AUTH_API_KEY", "")
         bind_host = os.getenv("MC_AUTH_BIND_HOST", "127.0.0.1")
         bind_port = int(os.getenv("MC_AUTH_BIND_PORT", "8080"))
 
-        app = web.Application()
+        middlewares = [correlation_middleware]
+        if self.traffic_recorder:
+            middlewares.append(traffic_middleware)
+            self.traffic_recorder.start()
+            log.info("Recording plugin traffic to %s", self.traffic_recorder.path)
+
+        app = web.Application(middlewares=middlewares)
+        app["recorder"] = self.traffic_recorder
         app["pool"] = self.pool
         app["api_key"] = api_key
         app.router.add_get("/v1/registration/{minecraft_uuid}", self.handle_registration)
@@ -125,38 +1352,119 @@ class MCRegistrationClient(discord.Client):
         app.router.add_get("/v1/role/{minecraft_uuid}", self.handle_role_info)
         app.router.add_post("/v1/server-status", self.handle_server_status)
         app.router.add_get("/v1/web-status", self.handle_web_status)
+        app.router.add_get("/v1/ready", self.handle_ready)
+        app.router.add_get("/debug/profile", self.handle_debug_profile)
 
         runner = web.AppRunner(app)
         await runner.setup()
         site = web.TCPSite(runner, bind_host, bind_port)
         await site.start()
         self.api_runner = runner
-        print(f"API server running on {bind_host}:{bind_port}")
+        log.info("API server running on %s:%s", bind_host, bind_port)
 
-    # Debounced panel updates
-    async def request_panel_update(self):
-        if self.panel_update_scheduled:
-            return
-        self.panel_update_scheduled = True
+    async def handle_ready(self, request: web.Request):
+        payload = {"ok": self.db_ready, "db": self.db_ready, "discord": self.is_ready()}
+        return web.json_response(payload, status=200 if self.db_ready else 503)
 
-        async def runner():
-            try:
-                await asyncio.sleep(self.panel_debounce_delay)
+    async def handle_debug_profile(self, request: web.Request):
+        api_key = request.app["api_key"]
+        provided_key = request.headers.get("X-API-Key", "")
+        # Unlike the plugin routes this one is never open: stacks leak internals
+        if not api_key:
+            return web.json_response({"ok": False, "error": "debug_disabled"}, status=403)
+        if provided_key != api_key:
+            return web.json_response({"ok": False, "error": "unauthorized"}, status=401)
+
+        try:
+            seconds = float(request.query.get("seconds", "5"))
+        except ValueError:
+            return web.json_response({"ok": False, "error": "invalid_seconds"}, status=400)
+        seconds = min(max(seconds, 0.0), 30.0)
 
-                loop = asyncio.get_running_loop()
-                now = loop.time()
-                wait = (self.last_panel_update + self.min_panel_interval) - now
-                if wait > 0:
-                    await asyncio.sleep(wait)
+        payload = {
+            "ok": True,
+            "loop": self.watchdog.stats(),
+            "executor": {
+                "max_workers": self.executor._max_workers,
+                "threads": len(self.executor._threads),
+                "queued": self.executor._work_queue.qsize(),
+            },
+            "tasks": len(asyncio.all_tasks()),
+            "upstreams": {
+                upstream.name: {
+                    host: {"state": breaker.state, "failures": breaker.failures}
+                    for host, breaker in upstream.breakers.items()
+                }
+                for upstream in (self.mcstatus, self.mojang)
+            },
+        }
 
-                await self.update_panel()
-                self.last_panel_update = loop.time()
-            except Exception:
-                traceback.print_exc()
-            finally:
-                self.panel_update_scheduled = False
+        if seconds > 0:
+            if self.watchdog.profile_lock.locked():
+                return web.json_response({"ok": False, "error": "profile_in_progress"}, status=409)
+            async with self.watchdog.profile_lock:
+                payload["profile"] = await self.watchdog.sample_profile(seconds)
+
+        return web.json_response(payload)
+
+    # The plugin names its server in X-Server-ID; requests without one go to the first configured server
+    def resolve_server(self, request: web.Request):
+        server_id = request.headers.get("X-Server-ID") or request.query.get("server")
+        server = self.servers.get(server_id) if server_id else self.default_server
+        # traffic_middleware records this so a replay routes the request to the same server
+        request["server_id"] = server.server_id if server else server_id
+        return server
+
+    # Debounced panel updates: mark panels dirty, the scheduler decides when to edit
+    def request_panel_update(self, server_id: str | None = None):
+        now = asyncio.get_running_loop().time()
+        for panel in self.panels:
+            if server_id is None or server_id in panel.server_ids:
+                if not panel.dirty:
+                    panel.dirty = True
+                    panel.dirty_since = now
+        self.panel_wakeup.set()
+
+    def panel_ready_at(self, panel: Panel):
+        return max(
+            panel.dirty_since + self.panel_debounce_delay,
+            panel.last_edit + self.min_panel_interval,
+            self.last_panel_edit + self.panel_edit_spacing,
+        )
 
-        asyncio.create_task(runner())
+    # One task for every panel: staggers status polls across servers and spaces out Discord edits
+    async def panel_scheduler_loop(self):
+        loop = asyncio.get_running_loop()
+        servers = list(self.servers.values())
+        start = loop.time()
+        for i, server in enumerate(servers):
+            server.next_poll = start + i * self.panel_poll_interval / len(servers)
+
+        while True:
+            now = loop.time()
+            for server in servers:
+                if now >= server.next_poll:
+                    server.next_poll = max(server.next_poll + self.panel_poll_interval, now)
+                    self.request_panel_update(server.server_id)
+
+            due = [panel for panel in self.panels if panel.dirty and self.panel_ready_at(panel) <= now]
+            if due:
+                panel = min(due, key=lambda p: p.dirty_since)
+                try:
+                    await self.update_panel(panel)
+                except Exception:
+                    log.exception("Panel update failed for %s", panel.key)
+                panel.last_edit = self.last_panel_edit = loop.time()
+                continue
+
+            self.panel_wakeup.clear()
+            wake_at = [server.next_poll for server in servers]
+            wake_at += [self.panel_ready_at(panel) for panel in self.panels if panel.dirty]
+            wait = min(wake_at, default=now + self.panel_poll_interval) - now
+            try:
+                await asyncio.wait_for(self.panel_wakeup.wait(), timeout=max(wait, 0.05))
+            except asyncio.TimeoutError:
+                pass
 
     async def handle_registration(self, request: web.Request):
         api_key = request.app["api_key"]
@@ -203,21 +1511,22 @@ class MCRegistrationClient(discord.Client):
         if event_type not in ("join", "leave"):
             return web.json_response({"ok": False, "error": "invalid_event"}, status=400)
 
+        server = self.resolve_server(request)
+        if server is None:
+            return web.json_response({"ok": False, "error": "unknown_server"}, status=404)
+
         if not self.log_channel_id:
             return web.json_response({"ok": False, "error": "log_channel_not_configured"}, status=400)
 
-        async with request.app["pool"].acquire() as conn:
-            _ = await conn.fetchrow(
-                "SELECT discord_id FROM users WHERE minecraft_uuid = $1",
-                minecraft_uuid,
-            )
-
         if event_type == "join" and minecraft_name:
-            self.online_players.add(minecraft_name)
+            server.player_joined(minecraft_name, minecraft_uuid)
+            # The plugin's uuid/name pair is authoritative, so a renamed player is caught on their next join
+            if self.registered.observe(minecraft_uuid, minecraft_name):
+                log.info("Linked player %s is now %s", minecraft_uuid, minecraft_name)
         elif event_type == "leave" and minecraft_name:
-            self.online_players.discard(minecraft_name)
+            server.player_left(minecraft_name, minecraft_uuid)
 
-        await self.request_panel_update()
+        self.request_panel_update(server.server_id)
         return web.json_response({"ok": True})
 
     async def handle_role_info(self, request: web.Request):
@@ -265,18 +1574,26 @@ class MCRegistrationClient(discord.Client):
         return web.json_response({"ok": True, "role": top_role.name, "color": top_role.color.value})
 
     async def handle_web_status(self, request: web.Request):
-        status = await self.fetch_server_status(background=True)
-        online_names = self.online_players
-        day = self.last_server_status.get("day")
-        time_of_day = self.last_server_status.get("time")
+        server = self.resolve_server(request)
+        if server is None:
+            return web.json_response(
+                {"ok": False, "error": "unknown_server"},
+                status=404,
+                headers={"Access-Control-Allow-Origin": "*"},
+            )
+
+        status = await self.fetch_server_status(server, background=True)
+        online_names = server.online_players
+        day = server.last_server_status.get("day")
+        time_of_day = server.last_server_status.get("time")
 
         online_count = len(online_names) if online_names else status.get("online", 0)
         ping = status.get("ping")
         version = status.get("version")
         if ping is not None:
-            self.last_server_status["ping"] = ping
+            server.last_server_status["ping"] = ping
         if version:
-            self.last_server_status["version"] = version
+            server.last_server_status["version"] = version
 
         payload = {
             "ok": True,
@@ -285,8 +1602,8 @@ class MCRegistrationClient(discord.Client):
                 "max": status.get("max", 0),
                 "list": sorted(online_names),
             },
-            "latency": ping if ping is not None else self.last_server_status.get("ping"),
-            "version": version or self.last_server_status.get("version"),
+            "latency": ping if ping is not None else server.last_server_status.get("ping"),
+            "version": version or server.last_server_status.get("version"),
             "day": day,
             "time": time_of_day,
         }
@@ -308,65 +1625,97 @@ class MCRegistrationClient(discord.Client):
         if not isinstance(day, int) or not isinstance(time_of_day, int):
             return web.json_response({"ok": False, "error": "invalid_payload"}, status=400)
 
-        self.last_server_status["day"] = day
-        self.last_server_status["time"] = time_of_day
+        server = self.resolve_server(request)
+        if server is None:
+            return web.json_response({"ok": False, "error": "unknown_server"}, status=404)
 
-        await self.request_panel_update()
-        return web.json_response({"ok": True})
+        server.last_server_status["day"] = day
+        server.last_server_status["time"] = time_of_day
 
-    async def panel_loop(self):
-        while True:
-            try:
-                await self.request_panel_update()
-            except Exception:
-                traceback.print_exc()
-            await asyncio.sleep(30)
+        self.request_panel_update(server.server_id)
+        return web.json_response({"ok": True})
 
-    def build_website_view(self):
-        view = discord.ui.View(timeout=None)
-        view.add_item(
-            discord.ui.Button(
-                label="Visit Website",
-                url="https://mc.marsphobos.com/",
-                style=discord.ButtonStyle.link,
+    def panel_view_for(self, panel: Panel):
+        if panel.view is None:
+            panel.view = PanelView(self, panel)
+        return panel.view
+
+    def build_roster_pages(self, panel: Panel):
+        """Every section of the panel's rosters, grouped into pages of embed fields."""
+        fields = []
+        for server_id in panel.server_ids:
+            server = self.servers[server_id]
+            for i, value in enumerate(server.panel_roster.sections()):
+                name = server.name if i == 0 else f"{server.name} (cont.)"
+                fields.append((name, value))
+        size = self.roster_page_sections
+        return [fields[i:i + size] for i in range(0, len(fields), size)]
+
+    async def collect_server_view(self, server: ServerState):
+        # Fetch data concurrently (reduces event loop blocking time)
+        try:
+            online_names, status = await asyncio.gather(
+                self.fetch_online_players(server, background=True),
+                self.fetch_server_status(server, background=True),
             )
-        )
-        return view
-
-    async def update_panel(self):
-        async with self.panel_lock:
-            if not self.log_channel_id:
-                return
-
-            channel = self.log_channel
-            if channel is None:
-                channel = self.get_channel(self.log_channel_id)
-            if channel is None:
-                try:
-                    channel = await self.fetch_channel(self.log_channel_id)
-                except discord.HTTPException:
-                    return
-                self.log_channel = channel
-
-            # Fetch data concurrently (reduces event loop blocking time)
-            try:
-                online_names, status = await asyncio.gather(
-                    self.fetch_online_players(background=True),
-                    self.fetch_server_status(background=True),
-                )
-            except Exception:
-                online_names, status = set(), {}
+        except Exception:
+            online_names, status = set(), {}
+
+        if not online_names:
+            online_names = server.online_players
+        server.panel_roster.sync(online_names)
+        return online_names, status
+
+    def format_game_time(self, server: ServerState):
+        day = server.last_server_status.get("day")
+        time_of_day = server.last_server_status.get("time")
+        if isinstance(day, int) and isinstance(time_of_day, int):
+            hour = ((time_of_day + 6000) % 24000) / 1000.0
+            hours = int(hour)
+            minutes = int((hour - hours) * 60)
+            return f"🗓️ Day {day}, ⏱️ {hours:02d}:{minutes:02d}"
+        return "🗓️ Unknown"
+
+    def add_roster_fields(self, embed: discord.Embed, server: ServerState, name: str, budget: int, max_fields: int):
+        """Adds at most max_fields fields and budget characters of roster; the rest is reachable through Browse."""
+        sections = server.panel_roster.sections()
+        if not sections:
+            embed.add_field(name=name, value="🔴 None", inline=False)
+            return
 
-            if not online_names:
-                online_names = self.online_players
+        shown = 0
+        for value, size in zip(sections, server.panel_roster.sizes):
+            # size counts each emoji as two characters, as Discord does
+            field_name = name if shown == 0 else "\u200b"
+            # Unless this is the last section, keep a field and room for the trailing "more" note
+            last = shown == len(sections) - 1
+            fields_needed = 1 if last else 2
+            chars_needed = len(field_name) + size + (0 if last else 80)
+            if chars_needed > budget or shown + fields_needed > max_fields:
+                break
+            embed.add_field(name=field_name, value=value, inline=False)
+            budget -= len(field_name) + size
+            shown += 1
+
+        hidden = sum(len(server.panel_roster.chunks[i]) for i in range(shown, len(sections)))
+        if hidden:
+            embed.add_field(name="\u200b", value=f"➕ {hidden} more. Press **Browse players** to see everyone.", inline=False)
+
+    def build_panel_embed(self, panel: Panel, views):
+        embed = discord.Embed(
+            title="Minecraft Server Panel",
+            url="https://github.com/M4R5-PH0B05/MinecraftDCLink",
+            description="This panel shows live server status, online players, and game time. Any issues, contact mars_phobos.",
+            color=discord.Color.blurple(),
+            timestamp=discord.utils.utcnow(),
+        )
+        footer = "MinecraftDCLink • View on GitHub"
 
-            embed = discord.Embed(
-                title="Minecraft Server Panel",
-                url="https://github.com/M4R5-PH0B05/MinecraftDCLink",
-                description="This panel shows live server status, online players, and game time. Any issues, contact mars_phobos.",
-                color=discord.Color.blurple(),
-                timestamp=discord.utils.utcnow(),
-            )
+        if len(panel.server_ids) == 1:
+            server = self.servers[panel.server_ids[0]]
+            online_names, status = views[0]
+            if len(self.servers) > 1:
+                embed.title = f"Minecraft Server Panel • {server.name}"
 
             online_count = len(online_names) if online_names else status.get("online", 0)
             max_players = status.get("max", 0)
@@ -380,77 +1729,120 @@ class MCRegistrationClient(discord.Client):
             if ping is not None:
                 embed.add_field(name="Ping", value=f"📶 {ping} ms", inline=True)
 
-            if self.server_address:
-                embed.add_field(name="Server IP", value=f"🔗 {self.server_address}", inline=True)
+            if server.server_address:
+                embed.add_field(name="Server IP", value=f"🔗 {server.server_address}", inline=True)
 
-            day = self.last_server_status.get("day")
-            time_of_day = self.last_server_status.get("time")
-            if isinstance(day, int) and isinstance(time_of_day, int):
-                hour = ((time_of_day + 6000) % 24000) / 1000.0
-                hours = int(hour)
-                minutes = int((hour - hours) * 60)
-                embed.add_field(name="Game Time", value=f"🗓️ Day {day}, ⏱️ {hours:02d}:{minutes:02d}", inline=True)
-            else:
-                embed.add_field(name="Game Time", value="🗓️ Unknown", inline=True)
-
-            if online_names:
-                names_list = sorted(online_names)
-                players_value = ", ".join([f"🟢 {name}" for name in names_list])
-                if len(players_value) > 1000:
-                    players_value = players_value[:1000] + "..."
-                embed.add_field(name="Online Players", value=players_value, inline=False)
-            else:
-                embed.add_field(name="Online Players", value="🔴 None", inline=False)
+            embed.add_field(name="Game Time", value=self.format_game_time(server), inline=True)
+            budget = self.panel_char_limit - len(embed) - len(footer)
+            self.add_roster_fields(embed, server, "Online Players", budget, self.panel_max_fields - len(embed.fields))
+        else:
+            # Combined panel: a summary field per server followed by its share of roster sections
+            summaries = []
+            for server_id, (online_names, status) in zip(panel.server_ids, views):
+                server = self.servers[server_id]
+                online_count = len(online_names) if online_names else status.get("online", 0)
+                max_players = status.get("max", 0)
+                parts = [f"👥 {online_count}/{max_players}" if max_players else f"👥 {online_count}"]
+                if status.get("ping") is not None:
+                    parts.append(f"📶 {status['ping']} ms")
+                if server.server_address:
+                    parts.append(f"🔗 {server.server_address}")
+                parts.append(self.format_game_time(server))
+                summaries.append((server, " • ".join(parts)))
+
+            # Summaries always fit (build_panels caps the server count); rosters share what's left.
+            # With too many servers for even one roster field each, the panel is summary-only.
+            count = len(summaries)
+            summary_chars = sum(len(server.name) + len(value) for server, value in summaries)
+            fields_each = (self.panel_max_fields - count) // count
+            budget_each = (self.panel_char_limit - len(embed) - len(footer) - summary_chars) // count
+            for server, value in summaries:
+                embed.add_field(name=server.name, value=value, inline=False)
+                if fields_each >= 1:
+                    self.add_roster_fields(embed, server, "Online Players", budget_each, fields_each)
+
+        embed.set_footer(text=footer)
+        return embed
+
+    async def update_panel(self, panel: Panel | None = None):
+        if panel is None:
+            for panel in self.panels:
+                await self.update_panel(panel)
+            return
+
+        async with self.panel_lock:
+            panel.dirty = False
+            if not self.log_channel_id:
+                return
 
-            embed.set_footer(text="MinecraftDCLink • View on GitHub")
+            channel = self.log_channel
+            if channel is None:
+                channel = self.get_channel(self.log_channel_id)
+            if channel is None:
+                try:
+                    channel = await self.fetch_channel(self.log_channel_id)
+                except discord.HTTPException:
+                    return
+                self.log_channel = channel
+
+            views = await asyncio.gather(
+                *(self.collect_server_view(self.servers[server_id]) for server_id in panel.server_ids)
+            )
+            embed = self.build_panel_embed(panel, views)
 
-            # Cache the view once (button doesn't change)
-            if self.panel_view is None:
-                self.panel_view = self.build_website_view()
+            view = self.panel_view_for(panel)
 
-            message = self.panel_message
-            if message is None and self.panel_message_id:
+            message = panel.message
+            if message is None and panel.message_id:
                 try:
-                    message = await channel.fetch_message(self.panel_message_id)
-                    self.panel_message = message
+                    message = await channel.fetch_message(panel.message_id)
+                    panel.message = message
                 except discord.HTTPException:
                     message = None
-                    self.panel_message = None
-                    self.panel_message_id = None
+                    panel.message = None
+                    panel.message_id = None
 
             if message is None:
-                message = await channel.send(embed=embed, view=self.panel_view)
-                self.panel_message = message
-                self.panel_message_id = message.id
-                print(f"Panel message ID: {self.panel_message_id}")
+                message = await channel.send(embed=embed, view=view)
+                panel.message = message
+                panel.message_id = message.id
+                panel.view_attached = True
+                log.info("Panel %s message ID: %s", panel.key, panel.message_id)
             else:
                 try:
-                    # Don't resend view every time; lighter payload, less lag
-                    await message.edit(embed=embed)
+                    # Send the view once per start (it may predate the Browse button), then embed-only edits
+                    if panel.view_attached:
+                        await message.edit(embed=embed)
+                    else:
+                        await message.edit(embed=embed, view=view)
+                        panel.view_attached = True
                 except discord.HTTPException:
-                    message = await channel.send(embed=embed, view=self.panel_view)
-                    self.panel_message = message
-                    self.panel_message_id = message.id
-                    print(f"Panel message recreated. ID: {self.panel_message_id}")
+                    message = await channel.send(embed=embed, view=view)
+                    panel.message = message
+                    panel.message_id = message.id
+                    panel.view_attached = True
+                    log.info("Panel %s message recreated. ID: %s", panel.key, panel.message_id)
+
+    async def fetch_status_document(self, server: ServerState, background: bool = False):
+        url = server.url
+        try:
+            if background:
+                # Shorter timeout for background tasks so they don't stall the gateway
+                status, data = await self.mcstatus.get_json(url, timeout=2.5)
+            else:
+                # A user is waiting: retry once and hedge a slow first attempt
+                status, data = await self.mcstatus.get_json(url, retries=1, hedge_after=1.0)
+        except UpstreamError as e:
+            log.debug("Status fetch failed: %s", e)
+            return None
 
-    async def fetch_online_players(self, background: bool = False):
-        if self.status_url:
-            url = self.status_url
-        else:
-            url = f"https://api.mcstatus.io/v2/status/java/{self.query_host}:{self.query_port}"
+        if status != 200 or not isinstance(data, dict):
+            return None
+        return data
 
-        if not self.aiohttp_session:
-            return set()
-
-        # Shorter timeout for background tasks so they don't stall the gateway
-        req_timeout = aiohttp.ClientTimeout(total=2.5) if background else None
-
-        try:
-            async with self.aiohttp_session.get(url, timeout=req_timeout) as response:
-                if response.status != 200:
-                    return set()
-                data = await response.json()
-        except Exception:
+    async def fetch_online_players(self, server: ServerState, background: bool = False):
+        data = await self.fetch_status_document(server, background)
+        if data is None:
             return set()
 
         players = data.get("players", {})
@@ -466,23 +1858,9 @@ class MCRegistrationClient(discord.Client):
                         names.append(name)
         return set(names)
 
-    async def fetch_server_status(self, background: bool = False):
-        if self.status_url:
-            url = self.status_url
-        else:
-            url = f"https://api.mcstatus.io/v2/status/java/{self.query_host}:{self.query_port}"
-
-        if not self.aiohttp_session:
-            return {}
-
-        req_timeout = aiohttp.ClientTimeout(total=2.5) if background else None
-
-        try:
-            async with self.aiohttp_session.get(url, timeout=req_timeout) as response:
-                if response.status != 200:
-                    return {}
-                data = await response.json()
-        except Exception:
+    async def fetch_server_status(self, server: ServerState, background: bool = False):
+        data = await self.fetch_status_document(server, background)
+        if data is None:
             return {}
 
         players = data.get("players", {})
@@ -493,20 +1871,78 @@ class MCRegistrationClient(discord.Client):
         version_name = version.get("name_clean") or version.get("name")
         return {"online": online, "max": max_players, "ping": ping, "version": version_name}
 
+    def find_online_server(self, name: str):
+        for server in self.servers.values():
+            if name in server.online_players:
+                return server
+        return None
+
+    def canonical_online_name(self, name: str):
+        for server in self.servers.values():
+            canonical = server.online_index.canonical(name)
+            if canonical in server.online_players:
+                return canonical
+        return name
+
+    def complete_online_names(self, prefix: str, limit: int = 25):
+        names = {}
+        for server in self.servers.values():
+            for name in server.online_index.complete(prefix, limit):
+                names.setdefault(name.lower(), name)
+        return [names[key] for key in sorted(names)[:limit]]
+
+    # Stats are per player, so any server with RCON will do; prefer the one they're on
+    def rcon_server_for(self, minecraft_uuid: str):
+        for server in self.servers.values():
+            if server.rcon and minecraft_uuid in server.online_uuids:
+                return server
+        return next((server for server in self.servers.values() if server.rcon), None)
+
+    async def fetch_all_online_players(self, background: bool = False):
+        results = await asyncio.gather(
+            *(self.fetch_online_players(server, background) for server in self.servers.values())
+        )
+        return set().union(*results)
+
     async def close(self):
+        self.watchdog.stop()
+        if self.backend_task and not self.backend_task.done():
+            self.backend_task.cancel()
         if self.api_runner:
             await self.api_runner.cleanup()
+        if self.traffic_recorder and self.traffic_recorder.thread.is_alive():
+            await asyncio.to_thread(self.traffic_recorder.stop)
         if self.panel_task:
             self.panel_task.cancel()
         if self.profile_task:
             self.profile_task.cancel()
+        if self.state_task:
+            self.state_task.cancel()
+        if self.username_task:
+            self.username_task.cancel()
+        # Only snapshot if startup got far enough to load the previous one
+        if self.db_ready:
+            try:
+                await self.save_state_snapshot()
+            except Exception:
+                log.exception("Final state snapshot failed")
+            try:
+                await self.flush_usernames()
+            except Exception:
+                log.exception("Final username flush failed")
 
-        if self.aiohttp_session:
-            await self.aiohttp_session.close()
+        await self.mcstatus.close()
+        await self.mojang.close()
 
         if self.pool:
             await self.pool.close()
 
+        for server in self.servers.values():
+            if server.rcon:
+                server.rcon.close()
+
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
         await super().close()
 
     async def profile_refresh_loop(self):
@@ -514,27 +1950,28 @@ class MCRegistrationClient(discord.Client):
             try:
                 await self.refresh_online_profiles()
             except Exception:
-                traceback.print_exc()
+                log.exception("Profile refresh failed")
             await asyncio.sleep(600)
 
     async def refresh_online_profiles(self):
-        if not self.rcon_host or not self.rcon_password:
-            return
-        if not self.online_players:
+        servers = [server for server in self.servers.values() if server.rcon and server.online_uuids]
+        if not servers:
             return
-
+        # Each server has its own RCON pool, so they can refresh side by side
+        await asyncio.gather(*(self.refresh_server_profiles(server) for server in servers))
+
+    async def refresh_server_profiles(self, server: ServerState):
+        # Only linked players get a profile row; both checks are in memory
+        players = [
+            (minecraft_uuid, name)
+            for minecraft_uuid, name in server.online_uuids.items()
+            if minecraft_uuid in self.registered
+        ]
         async with self.pool.acquire() as conn:
-            for name in list(self.online_players):
-                stats = await self.fetch_profile_via_rcon(name)
+            for minecraft_uuid, name in players:
+                stats = await self.fetch_profile_via_rcon(server, name)
                 if stats is None:
                     continue
-                user_row = await conn.fetchrow(
-                    "SELECT minecraft_uuid FROM users WHERE current_username = $1",
-                    name,
-                )
-                if not user_row:
-                    continue
-                minecraft_uuid = user_row["minecraft_uuid"]
                 await conn.execute(
                     """
                     INSERT INTO profiles (minecraft_uuid, level, playtime_seconds, deaths, last_updated)
@@ -551,21 +1988,16 @@ class MCRegistrationClient(discord.Client):
                     stats["deaths"],
                 )
 
-    async def fetch_profile_via_rcon(self, player_name: str):
-        return await asyncio.to_thread(self._fetch_profile_via_rcon_sync, player_name)
+    async def fetch_profile_via_rcon(self, server: ServerState, player_name: str):
+        return await asyncio.to_thread(self._fetch_profile_via_rcon_sync, server, player_name)
 
-    def _fetch_profile_via_rcon_sync(self, player_name: str):
+    def _fetch_profile_via_rcon_sync(self, server: ServerState, player_name: str):
         try:
-            client = RCONClient(self.rcon_host, port=self.rcon_port)
-            if not client.login(self.rcon_password):
-                return None
-
-            client.command("scoreboard objectives add dclink_playtime minecraft.custom:minecraft.play_time")
-            client.command("scoreboard objectives add dclink_deaths minecraft.custom:minecraft.deaths")
-
-            level_resp = client.command(f"experience query {player_name} levels")
-            play_resp = client.command(f"scoreboard players get {player_name} dclink_playtime")
-            death_resp = client.command(f"scoreboard players get {player_name} dclink_deaths")
+            level_resp, play_resp, death_resp = server.rcon.run([
+                f"experience query {player_name} levels",
+                f"scoreboard players get {player_name} dclink_playtime",
+                f"scoreboard players get {player_name} dclink_deaths",
+            ])
 
             level = self._parse_last_int(level_resp)
             playtime_ticks = self._parse_last_int(play_resp)
@@ -604,13 +2036,7 @@ class RegistrationBot:
         intents.message_content = False
 
         self.client = MCRegistrationClient(intents=intents)
-        self.client.query_host = os.getenv("MC_QUERY_HOST", "127.0.0.1")
-        self.client.query_port = int(os.getenv("MC_QUERY_PORT", "25565"))
-        self.client.status_url = os.getenv("MC_STATUS_URL", "").strip()
-        self.client.server_address = os.getenv("MC_SERVER_ADDRESS", "").strip()
-        self.client.rcon_host = os.getenv("RCON_HOST", "")
-        self.client.rcon_port = int(os.getenv("RCON_PORT", "25575"))
-        self.client.rcon_password = os.getenv("RCON_PASSWORD", "")
+        self.client.servers = load_servers_from_env()
         self.setup_commands()
 
     def setup_commands(self):
@@ -625,11 +2051,14 @@ class RegistrationBot:
             except InteractionResponded:
                 pass
 
+            # Fix up case typos against the live roster before spending upstream round trips
+            minecraft_name = self.client.canonical_online_name(minecraft_name)
+
             try:
-                if minecraft_name in self.client.online_players:
-                    online_players = self.client.online_players
+                if self.client.find_online_server(minecraft_name) is not None:
+                    online_players = {minecraft_name}
                 else:
-                    online_players = await self.client.fetch_online_players(background=False)
+                    online_players = await self.client.fetch_all_online_players(background=False)
                     if not online_players:
                         await interaction.followup.send(
                             "Cannot check server status right now. Try again later.",
@@ -701,6 +2130,7 @@ class RegistrationBot:
                         interaction.user.id,
                         minecraft_name,
                     )
+                self.client.registered.link(str(parsed_uuid), minecraft_name)
 
                 embed = discord.Embed(
                     title="Registration successful",
@@ -728,7 +2158,7 @@ class RegistrationBot:
                 # token expired mid-flow; nothing else to do
                 return
             except Exception:
-                traceback.print_exc()
+                log.exception("Registration failed for %s", minecraft_name)
                 try:
                     await interaction.followup.send(
                         "Registration failed due to an internal error.",
@@ -737,6 +2167,14 @@ class RegistrationBot:
                 except Exception:
                     pass
 
+        # Autocomplete must answer within 3 seconds, so it only reads the in-memory indexes
+        @link_minecraft.autocomplete("minecraft_name")
+        async def register_name_autocomplete(interaction: discord.Interaction, current: str):
+            return [
+                app_commands.Choice(name=name, value=name)
+                for name in self.client.complete_online_names(current)
+            ]
+
         @self.client.tree.command(name="checklink", description="Check your Minecraft account link")
         async def check_link(interaction: discord.Interaction):
             try:
@@ -780,40 +2218,41 @@ class RegistrationBot:
             except InteractionResponded:
                 pass
 
-            if not self.client.pool:
+            if not self.client.pool or not self.client.db_ready:
                 await interaction.followup.send(
                     "Database connection error. Please contact an admin.",
                     ephemeral=True,
                 )
                 return
 
-            async with self.client.pool.acquire() as conn:
-                if minecraft_name:
-                    user_row = await conn.fetchrow(
-                        "SELECT minecraft_uuid, current_username FROM users WHERE current_username = $1",
-                        minecraft_name,
-                    )
-                else:
+            # Names resolve in memory, which also sees renames that haven't been flushed yet
+            if minecraft_name:
+                minecraft_uuid = self.client.registered.uuid_for(minecraft_name)
+                display_name = self.client.registered.name_for(minecraft_uuid) if minecraft_uuid else None
+            else:
+                async with self.client.pool.acquire() as conn:
                     user_row = await conn.fetchrow(
                         "SELECT minecraft_uuid, current_username FROM users WHERE discord_id = $1",
                         interaction.user.id,
                     )
+                minecraft_uuid = display_name = None
+                if user_row:
+                    minecraft_uuid = user_row["minecraft_uuid"]
+                    display_name = self.client.registered.name_for(minecraft_uuid) or user_row["current_username"]
 
-            if not user_row:
+            if not minecraft_uuid:
                 await interaction.followup.send("No linked account found.", ephemeral=True)
                 return
 
-            minecraft_uuid = user_row["minecraft_uuid"]
-            display_name = user_row["current_username"]
-
-            if not self.client.rcon_host or not self.client.rcon_password:
+            rcon_server = self.client.rcon_server_for(minecraft_uuid)
+            if rcon_server is None:
                 await interaction.followup.send(
                     "RCON is not configured. Please contact an admin.",
                     ephemeral=True,
                 )
                 return
 
-            stats = await self.client.fetch_profile_via_rcon(display_name)
+            stats = await self.client.fetch_profile_via_rcon(rcon_server, display_name)
             cache_row = None
 
             if stats is not None:
@@ -873,18 +2312,23 @@ class RegistrationBot:
 
             await interaction.followup.send(embed=embed, ephemeral=True)
 
+        @profile.autocomplete("minecraft_name")
+        async def profile_name_autocomplete(interaction: discord.Interaction, current: str):
+            return [
+                app_commands.Choice(name=name, value=name)
+                for name in self.client.registered.index.complete(current)
+            ]
+
     async def resolve_uuid(self, minecraft_name: str):
         url = f"https://api.mojang.com/users/profiles/minecraft/{minecraft_name}"
 
-        if not self.client.aiohttp_session:
+        try:
+            status, data = await self.client.mojang.get_json(url, retries=1, hedge_after=1.0)
+        except UpstreamError as e:
+            log.warning("Mojang lookup for %s failed: %s", minecraft_name, e)
             return None
 
-        try:
-            async with self.client.aiohttp_session.get(url) as response:
-                if response.status != 200:
-                    return None
-                data = await response.json()
-        except Exception:
+        if status != 200 or not isinstance(data, dict):
             return None
 
         raw_uuid = data.get("id")
@@ -893,9 +2337,16 @@ class RegistrationBot:
         return str(uuid.UUID(raw_uuid))
 
     def run(self):
-        self.client.run(os.getenv("DISCORD_BOT_TOKEN"))
+        # discord.py logs through the root logger set up by setup_logging
+        self.client.run(os.getenv("DISCORD_BOT_TOKEN"), log_handler=None)
 
 
 if __name__ == "__main__":
-    bot = RegistrationBot()
-    bot.run()
+    # docker stop sends SIGTERM; treat it like Ctrl+C so Client.run closes cleanly (final snapshot, recorder flush)
+    signal.signal(signal.SIGTERM, signal.default_int_handler)
+    log_listener = setup_logging()
+    try:
+        bot = RegistrationBot()
+        bot.run()
+    finally:
+        log_listener.stop()
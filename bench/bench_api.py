@@ -0,0 +1,195 @@
+"""Benchmarks for the bot's HTTP API and panel pipeline.
+
+Runs MCRegistrationClient against local fakes (or a real Postgres with --dsn)
+and reports throughput and p50/p99 latency per endpoint.
+
+    python -m bench.bench_api --players 200 --json bench_results.json
+    python -m bench.bench_api --baseline bench_results.json --max-regression 0.25
+
+With --baseline the run exits non-zero if any endpoint's p99 got worse than
+the baseline by more than --max-regression (a fraction).
+"""
+import argparse
+import asyncio
+import json
+import logging
+import sys
+import time
+
+from bench.fakes import make_players
+from bench.harness import BenchEnvironment, LatencyRecorder
+
+
+async def mass_reconnect(env: BenchEnvironment, recorder: LatencyRecorder, concurrency: int):
+    """Every player reconnecting at once: registration check, role lookup, join event."""
+    players = list(env.players)
+
+    async def worker():
+        while players:
+            minecraft_uuid, name, _ = players.pop()
+            await env.timed_request(recorder, "GET /v1/registration", "GET", f"/v1/registration/{minecraft_uuid}")
+            await env.timed_request(recorder, "GET /v1/role", "GET", f"/v1/role/{minecraft_uuid}")
+            await env.timed_request(
+                recorder,
+                "POST /v1/mc-event",
+                "POST",
+                "/v1/mc-event",
+                {"uuid": minecraft_uuid, "name": name, "event": "join"},
+            )
+
+    async def reconnect():
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+
+    await env.drive(reconnect())
+
+
+async def web_polling_storm(env: BenchEnvironment, recorder: LatencyRecorder, clients: int, duration: float):
+    """Many website visitors polling /v1/web-status back to back."""
+
+    async def storm():
+        deadline = time.perf_counter() + duration
+
+        async def poller():
+            while time.perf_counter() < deadline:
+                await env.timed_request(recorder, "GET /v1/web-status", "GET", "/v1/web-status")
+
+        await asyncio.gather(*(poller() for _ in range(clients)))
+
+    await env.drive(storm())
+
+
+async def server_status_stream(env: BenchEnvironment, recorder: LatencyRecorder, count: int):
+    async def stream():
+        for i in range(count):
+            await env.timed_request(
+                recorder, "POST /v1/server-status", "POST", "/v1/server-status", {"day": i, "time": (i * 600) % 24000}
+            )
+
+    await env.drive(stream())
+
+
+async def profile_refresh_cycles(env: BenchEnvironment, recorder: LatencyRecorder, cycles: int):
+    client = env.client
+    client.default_server.set_online_players(
+        (name for _, name, _ in env.players),
+        {minecraft_uuid: name for minecraft_uuid, name, _ in env.players},
+    )
+    for _ in range(cycles):
+        started = time.perf_counter()
+        await client.refresh_online_profiles()
+        recorder.record("refresh_online_profiles", time.perf_counter() - started)
+
+
+async def panel_update_cycles(env: BenchEnvironment, recorder: LatencyRecorder, cycles: int):
+    client = env.client
+    for _ in range(cycles):
+        started = time.perf_counter()
+        await client.update_panel()
+        recorder.record("update_panel", time.perf_counter() - started)
+
+
+async def run(args):
+    players = make_players(args.players)
+    recorder = LatencyRecorder()
+    env = BenchEnvironment(
+        players,
+        dsn=args.dsn,
+        db_latency=args.db_latency,
+        discord_latency=args.discord_latency,
+        status_latency=args.status_latency,
+        rcon_latency=args.rcon_latency,
+    )
+    async with env:
+        await mass_reconnect(env, recorder, args.concurrency)
+        await web_polling_storm(env, recorder, args.pollers, args.poll_seconds)
+        await server_status_stream(env, recorder, args.players)
+        await profile_refresh_cycles(env, recorder, args.cycles)
+        await panel_update_cycles(env, recorder, args.cycles)
+
+        extra = {
+            "panel_edits": env.channel.edits,
+            "panel_sends": env.channel.sends,
+            "status_requests": env.minecraft.status_requests,
+            "rcon_commands": env.minecraft.rcon_commands,
+        }
+
+    return {
+        "config": {
+            "players": args.players,
+            "concurrency": args.concurrency,
+            "pollers": args.pollers,
+            "poll_seconds": args.poll_seconds,
+            "cycles": args.cycles,
+            "backend": "postgres" if args.dsn else "fake",
+        },
+        "endpoints": recorder.summary(),
+        "counters": extra,
+    }
+
+
+def print_report(results):
+    header = f"{'endpoint':<28}{'count':>8}{'err':>6}{'req/s':>10}{'p50 ms':>10}{'p99 ms':>10}{'max ms':>10}"
+    print(header)
+    print("-" * len(header))
+    for endpoint, row in results["endpoints"].items():
+        print(
+            f"{endpoint:<28}{row['count']:>8}{row['errors']:>6}{row['throughput']:>10}"
+            f"{row['p50_ms']:>10}{row['p99_ms']:>10}{row['max_ms']:>10}"
+        )
+    for key, value in results["counters"].items():
+        print(f"{key}: {value}")
+
+
+def compare_to_baseline(results, baseline, max_regression: float):
+    regressions = []
+    for endpoint, row in results["endpoints"].items():
+        previous = baseline.get("endpoints", {}).get(endpoint)
+        if not previous or not previous.get("p99_ms"):
+            continue
+        change = (row["p99_ms"] - previous["p99_ms"]) / previous["p99_ms"]
+        if change > max_regression:
+            regressions.append(f"{endpoint}: p99 {previous['p99_ms']}ms -> {row['p99_ms']}ms (+{change:.0%})")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--players", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--pollers", type=int, default=50)
+    parser.add_argument("--poll-seconds", type=float, default=5.0)
+    parser.add_argument("--cycles", type=int, default=5)
+    parser.add_argument(
+        "--dsn",
+        help="Postgres DSN; runs in a temporary schema that is dropped afterwards. Uses an in-memory fake pool when omitted",
+    )
+    parser.add_argument("--db-latency", type=float, default=0.001)
+    parser.add_argument("--discord-latency", type=float, default=0.05)
+    parser.add_argument("--status-latency", type=float, default=0.02)
+    parser.add_argument("--rcon-latency", type=float, default=0.002)
+    parser.add_argument("--json", dest="json_path", help="write machine-readable results here")
+    parser.add_argument("--baseline", help="results JSON from an earlier run to compare p99 against")
+    parser.add_argument("--max-regression", type=float, default=0.25)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    results = asyncio.run(run(args))
+    print_report(results)
+
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare_to_baseline(results, baseline, args.max_regression)
+        if regressions:
+            print("Regressions against baseline:")
+            for line in regressions:
+                print(f"  {line}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,272 @@
+"""Local stand-ins for the bot's backends: Postgres, Discord, mcstatus and RCON.
+
+Everything here is deliberately small. The fakes only understand the queries and
+calls BotPython actually makes, and raise on anything else so a schema or query
+change shows up as a loud failure instead of silently skewed numbers.
+"""
+import asyncio
+import struct
+import threading
+import uuid
+from contextlib import asynccontextmanager
+
+from aiohttp import web
+
+
+def make_players(count: int):
+    """Deterministic (uuid, name, discord_id) triples so runs are comparable."""
+    players = []
+    for i in range(count):
+        name = f"Player{i:04d}"
+        minecraft_uuid = str(uuid.uuid5(uuid.NAMESPACE_DNS, f"mcdclink-bench-{name}"))
+        players.append((minecraft_uuid, name, 100000000000000000 + i))
+    return players
+
+
+# FAKE POSTGRES
+class FakeConnection:
+    def __init__(self, pool):
+        self.pool = pool
+
+    async def _roundtrip(self):
+        if self.pool.latency:
+            await asyncio.sleep(self.pool.latency)
+
+    async def fetchrow(self, query: str, *args):
+        await self._roundtrip()
+        users = self.pool.users
+        if "SELECT discord_id FROM users WHERE minecraft_uuid" in query:
+            user = users.get(args[0])
+            return {"discord_id": user["discord_id"]} if user else None
+        raise NotImplementedError(f"FakeConnection.fetchrow: {query.strip()[:80]}")
+
+    async def fetch(self, query: str, *args):
+        await self._roundtrip()
+        if "SELECT minecraft_uuid, current_username FROM users" in query:
+            return [
+                {"minecraft_uuid": minecraft_uuid, "current_username": user["current_username"]}
+                for minecraft_uuid, user in self.pool.users.items()
+            ]
+        raise NotImplementedError(f"FakeConnection.fetch: {query.strip()[:80]}")
+
+    async def execute(self, query: str, *args):
+        await self._roundtrip()
+        if "INSERT INTO profiles" in query:
+            minecraft_uuid, level, playtime_seconds, deaths = args
+            self.pool.profiles[minecraft_uuid] = {
+                "level": level,
+                "playtime_seconds": playtime_seconds,
+                "deaths": deaths,
+            }
+            return "INSERT 0 1"
+        if "UPDATE users SET current_username" in query:
+            minecraft_uuid, name = args
+            if minecraft_uuid not in self.pool.users:
+                return "UPDATE 0"
+            self.pool.users[minecraft_uuid]["current_username"] = name
+            return "UPDATE 1"
+        raise NotImplementedError(f"FakeConnection.execute: {query.strip()[:80]}")
+
+    async def executemany(self, query: str, args):
+        for row in args:
+            await self.execute(query, *row)
+
+
+class FakePool:
+    """asyncpg.Pool look-alike with a bounded number of connections and a fixed per-query latency."""
+
+    def __init__(self, players, latency: float = 0.001, max_size: int = 10):
+        self.latency = latency
+        self.users = {
+            minecraft_uuid: {"discord_id": discord_id, "current_username": name}
+            for minecraft_uuid, name, discord_id in players
+        }
+        self.profiles = {}
+        self.semaphore = asyncio.Semaphore(max_size)
+
+    @asynccontextmanager
+    async def acquire(self):
+        async with self.semaphore:
+            yield FakeConnection(self)
+
+    async def close(self):
+        pass
+
+
+# FAKE DISCORD
+class FakeColor:
+    def __init__(self, value: int):
+        self.value = value
+
+
+class FakeRole:
+    def __init__(self, name: str, position: int, color: int, default: bool = False):
+        self.name = name
+        self.position = position
+        self.color = FakeColor(color)
+        self.default = default
+
+    def is_default(self):
+        return self.default
+
+
+class FakeMember:
+    def __init__(self, member_id: int):
+        self.id = member_id
+        self.roles = [
+            FakeRole("@everyone", 0, 0, default=True),
+            FakeRole("Member", 1, 0x3498DB),
+            FakeRole("Veteran", 2 + member_id % 3, 0xE67E22),
+        ]
+
+
+class FakeGuild:
+    def __init__(self, latency: float):
+        self.latency = latency
+
+    async def fetch_member(self, member_id: int):
+        await asyncio.sleep(self.latency)
+        return FakeMember(member_id)
+
+
+class FakeMessage:
+    def __init__(self, channel, message_id: int):
+        self.channel = channel
+        self.id = message_id
+        self.embed = None
+
+    async def edit(self, **kwargs):
+        await asyncio.sleep(self.channel.latency)
+        self.channel.edits += 1
+        self.embed = kwargs.get("embed")
+        self.channel.last_embed = self.embed
+
+
+class FakeChannel:
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.edits = 0
+        self.sends = 0
+        self.last_embed = None
+        self.messages = {}
+
+    async def send(self, embed=None, view=None):
+        await asyncio.sleep(self.latency)
+        self.sends += 1
+        self.last_embed = embed
+        message = FakeMessage(self, 1000 + self.sends)
+        message.embed = embed
+        self.messages[message.id] = message
+        return message
+
+    async def fetch_message(self, message_id: int):
+        await asyncio.sleep(self.latency)
+        return self.messages.get(message_id) or FakeMessage(self, message_id)
+
+
+# FAKE MCSTATUS + RCON
+class FakeMinecraftServer:
+    """Serves an mcstatus.io-shaped status document and a Source RCON endpoint."""
+
+    def __init__(self, players, status_latency: float = 0.02, rcon_latency: float = 0.002, password: str = "bench"):
+        self.online = {name for _, name, _ in players}
+        self.status_latency = status_latency
+        self.rcon_latency = rcon_latency
+        self.password = password
+        self.status_requests = 0
+        self.rcon_commands = 0
+        self.status_port = None
+        self.rcon_port = None
+        self._runner = None
+        self._rcon_server = None
+
+    async def start(self):
+        app = web.Application()
+        app.router.add_get("/status", self.handle_status)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, "127.0.0.1", 0)
+        await site.start()
+        self.status_port = site._server.sockets[0].getsockname()[1]
+
+        self._rcon_server = await asyncio.start_server(self.handle_rcon, "127.0.0.1", 0)
+        self.rcon_port = self._rcon_server.sockets[0].getsockname()[1]
+
+    async def stop(self):
+        if self._rcon_server:
+            self._rcon_server.close()
+            await self._rcon_server.wait_closed()
+        if self._runner:
+            await self._runner.cleanup()
+
+    async def handle_status(self, request: web.Request):
+        self.status_requests += 1
+        await asyncio.sleep(self.status_latency)
+        names = sorted(self.online)
+        return web.json_response({
+            "online": True,
+            "players": {
+                "online": len(names),
+                "max": max(len(names), 100),
+                "list": [{"name_raw": name, "name_clean": name} for name in names],
+            },
+            "version": {"name_clean": "1.21.1"},
+            "latency": 12,
+        })
+
+    async def handle_rcon(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                length = struct.unpack("<i", await reader.readexactly(4))[0]
+                data = await reader.readexactly(length)
+                reqid, reqtype = struct.unpack("<ii", data[:8])
+                body = data[8:-2].decode("utf-8", errors="replace")
+
+                if reqtype == 3:
+                    # Login: echo the request ID on success, -1 on a bad password
+                    self._write_rcon(writer, reqid if body == self.password else -1, 2, "")
+                    await writer.drain()
+                    continue
+
+                self.rcon_commands += 1
+                if self.rcon_latency:
+                    await asyncio.sleep(self.rcon_latency)
+                self._write_rcon(writer, reqid, 0, self.rcon_reply(body))
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    def _write_rcon(self, writer, reqid: int, reqtype: int, body: str):
+        payload = struct.pack("<ii", reqid, reqtype) + body.encode("utf-8") + b"\x00\x00"
+        writer.write(struct.pack("<i", len(payload)) + payload)
+
+    def rcon_reply(self, command: str):
+        parts = command.split()
+        if command.startswith("experience query") and len(parts) >= 3:
+            return f"{parts[2]} has {len(parts[2]) * 3} experience levels"
+        if command.startswith("scoreboard players get") and len(parts) >= 5:
+            value = 72000 if parts[4] == "dclink_playtime" else 2
+            return f"{parts[3]} has {value} [{parts[4]}]"
+        if command.startswith("scoreboard objectives add"):
+            return "An objective already exists by that name"
+        return f"Unknown or incomplete command: {command}"
+
+
+class BackgroundLoop:
+    """An event loop on its own thread, so fakes and load generators don't share the bot's loop."""
+
+    def __init__(self):
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever, name="bench-backends", daemon=True)
+
+    def start(self):
+        self.thread.start()
+
+    async def run(self, coro):
+        return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(coro, self.loop))
+
+    def stop(self):
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join(timeout=5)
@@ -0,0 +1,215 @@
+"""Boots MCRegistrationClient's HTTP API against the fakes in bench.fakes."""
+import asyncio
+import os
+import time
+import uuid
+
+import aiohttp
+import asyncpg
+import discord
+
+import BotPython
+from bench.fakes import BackgroundLoop, FakeChannel, FakeGuild, FakeMinecraftServer, FakePool
+
+API_KEY = "bench-key"
+
+
+def percentile(sorted_values, fraction: float):
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, max(0, int(round(fraction * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+
+class LatencyRecorder:
+    def __init__(self):
+        self.samples = {}
+        self.errors = {}
+        self.started = {}
+        self.finished = {}
+
+    def record(self, endpoint: str, seconds: float, ok: bool = True):
+        now = time.perf_counter()
+        self.started.setdefault(endpoint, now - seconds)
+        self.finished[endpoint] = now
+        self.samples.setdefault(endpoint, []).append(seconds)
+        if not ok:
+            self.errors[endpoint] = self.errors.get(endpoint, 0) + 1
+
+    def summary(self):
+        results = {}
+        for endpoint, values in sorted(self.samples.items()):
+            values = sorted(values)
+            elapsed = max(self.finished[endpoint] - self.started[endpoint], 1e-9)
+            results[endpoint] = {
+                "count": len(values),
+                "errors": self.errors.get(endpoint, 0),
+                "throughput": round(len(values) / elapsed, 2),
+                "p50_ms": round(percentile(values, 0.50) * 1000, 3),
+                "p99_ms": round(percentile(values, 0.99) * 1000, 3),
+                "max_ms": round(values[-1] * 1000, 3),
+            }
+        return results
+
+
+class BenchEnvironment:
+    """The bot's API on this loop; the fake Minecraft server and load generators on a background loop."""
+
+    def __init__(
+        self,
+        players,
+        *,
+        dsn: str | None = None,
+        db_latency: float = 0.001,
+        discord_latency: float = 0.05,
+        status_latency: float = 0.02,
+        rcon_latency: float = 0.002,
+        server_ids=("default",),
+    ):
+        self.players = players
+        self.dsn = dsn
+        # With --dsn everything lives in a throwaway schema, dropped in stop()
+        self.schema = None
+        self.db_latency = db_latency
+        self.discord_latency = discord_latency
+        self.status_latency = status_latency
+        self.rcon_latency = rcon_latency
+        self.server_ids = list(server_ids)
+        self.backends = BackgroundLoop()
+        # One fake per bot server; self.minecraft is the first (default) one
+        self.minecrafts = {}
+        self.minecraft = None
+        self.client = None
+        self.channel = None
+        self.base_url = ""
+        self.http = None
+
+    async def __aenter__(self):
+        try:
+            await self.start()
+        except BaseException:
+            await self.stop()
+            raise
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.stop()
+
+    async def start(self):
+        self.backends.start()
+        for server_id in self.server_ids:
+            minecraft = FakeMinecraftServer(
+                self.players, status_latency=self.status_latency, rcon_latency=self.rcon_latency
+            )
+            await self.backends.run(minecraft.start())
+            self.minecrafts[server_id] = minecraft
+        self.minecraft = self.minecrafts[self.server_ids[0]]
+
+        os.environ["MC_AUTH_API_KEY"] = API_KEY
+        os.environ["MC_AUTH_BIND_HOST"] = "127.0.0.1"
+        os.environ["MC_AUTH_BIND_PORT"] = "0"
+
+        client = BotPython.MCRegistrationClient(intents=discord.Intents.default())
+        # Assigned now so stop() cleans up after a start that fails part way
+        self.client = client
+        client.servers = {
+            server_id: BotPython.ServerState(
+                server_id,
+                status_url=f"http://127.0.0.1:{minecraft.status_port}/status",
+                rcon_host="127.0.0.1",
+                rcon_port=minecraft.rcon_port,
+                rcon_password=minecraft.password,
+            )
+            for server_id, minecraft in self.minecrafts.items()
+        }
+        client.build_panels()
+        client.log_channel_id = 1
+        client.guild_id = 1
+        self.channel = FakeChannel(self.discord_latency)
+        client.log_channel = self.channel
+        guild = FakeGuild(self.discord_latency)
+        client.get_guild = lambda guild_id: guild
+        asyncio.get_running_loop().set_default_executor(client.executor)
+        client.mcstatus.start()
+        client.mojang.start()
+
+        if self.dsn:
+            schema = f"mcdclink_bench_{uuid.uuid4().hex[:12]}"
+            conn = await asyncpg.connect(self.dsn)
+            try:
+                await conn.execute(f'CREATE SCHEMA "{schema}"')
+            finally:
+                await conn.close()
+            self.schema = schema
+            # Unqualified table names in the bot's queries resolve to the bench schema only
+            client.pool = await asyncpg.create_pool(self.dsn, server_settings={"search_path": schema})
+            await client.create_schema()
+            async with client.pool.acquire() as conn:
+                await conn.executemany(
+                    """
+                    INSERT INTO users (minecraft_uuid, discord_id, current_username)
+                    VALUES ($1, $2, $3)
+                    ON CONFLICT DO NOTHING
+                    """,
+                    [(minecraft_uuid, discord_id, name) for minecraft_uuid, name, discord_id in self.players],
+                )
+        else:
+            client.pool = FakePool(self.players, latency=self.db_latency)
+
+        await client.load_registered_names()
+        await client.start_api_server()
+        client.db_ready = True
+
+        host, port = client.api_runner.addresses[0][:2]
+        self.base_url = f"http://{host}:{port}"
+        self.http = await self.backends.run(self._open_http())
+
+    async def _open_http(self):
+        connector = aiohttp.TCPConnector(limit=0)
+        return aiohttp.ClientSession(connector=connector, headers={"X-API-Key": API_KEY})
+
+    async def stop(self):
+        if self.http:
+            await self.backends.run(self.http.close())
+        if self.client:
+            client = self.client
+            for task in asyncio.all_tasks():
+                if task is not asyncio.current_task():
+                    task.cancel()
+            if client.api_runner:
+                await client.api_runner.cleanup()
+            if client.traffic_recorder and client.traffic_recorder.thread.is_alive():
+                client.traffic_recorder.stop()
+            await client.mcstatus.close()
+            await client.mojang.close()
+            if client.pool:
+                await client.pool.close()
+            for server in client.servers.values():
+                if server.rcon:
+                    await asyncio.to_thread(server.rcon.close)
+            client.executor.shutdown(wait=False, cancel_futures=True)
+        if self.schema:
+            conn = await asyncpg.connect(self.dsn)
+            try:
+                await conn.execute(f'DROP SCHEMA IF EXISTS "{self.schema}" CASCADE')
+            finally:
+                await conn.close()
+            self.schema = None
+        for minecraft in self.minecrafts.values():
+            await self.backends.run(minecraft.stop())
+        self.backends.stop()
+
+    async def timed_request(self, recorder: LatencyRecorder, label: str, method: str, path: str, json_body=None):
+        """One API call, recorded under label. Must run on the background loop (see drive)."""
+        started = time.perf_counter()
+        try:
+            async with self.http.request(method, self.base_url + path, json=json_body) as response:
+                await response.read()
+                ok = response.status < 500
+        except aiohttp.ClientError:
+            ok = False
+        recorder.record(label, time.perf_counter() - started, ok)
+
+    async def drive(self, coro):
+        """Run a load-generating coroutine on the background loop so it doesn't compete with the bot."""
+        return await self.backends.run(coro)
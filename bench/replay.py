@@ -0,0 +1,310 @@
+"""Replays traffic captured with MC_TRAFFIC_RECORD_FILE against a bot on local fakes.
+
+    python -m bench.replay traffic.jsonl.gz --speed 20 --json replay_results.json
+
+Requests are sent at their recorded offsets divided by --speed. Requests for the
+same player (or one server's status stream) keep their recorded order, and each
+goes to the server it was recorded against. Afterwards every server's roster,
+game time and panel are checked against what the recording implies, and response
+statuses are compared with the recorded ones. Exits non-zero on any mismatch.
+"""
+import argparse
+import asyncio
+import gzip
+import json
+import logging
+import sys
+import time
+
+import aiohttp
+
+from bench.bench_api import print_report
+from bench.harness import BenchEnvironment, LatencyRecorder
+
+
+def load_recording(path: str):
+    opener = gzip.open if path.endswith(".gz") else open
+    entries = []
+    first_started = None
+    offset = 0.0
+    try:
+        with opener(path, "rt", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    # Last line cut short by a killed bot
+                    break
+                # Header lines (one per bot start) carry no request, and "t" restarts from 0 after each
+                if "p" not in entry:
+                    started = entry.get("started")
+                    if isinstance(started, (int, float)):
+                        if first_started is None:
+                            first_started = started
+                        offset = started - first_started
+                    continue
+                entry["t"] = round(entry["t"] + offset, 4)
+                entries.append(entry)
+    except EOFError:
+        # Unfinished gzip stream from a killed bot; keep everything read so far
+        print(f"{path} is truncated, replaying the {len(entries)} complete requests", file=sys.stderr)
+    return entries
+
+
+SERVER_PATHS = ("/v1/mc-event", "/v1/server-status")
+
+
+def server_of(entry):
+    # Recordings from before multi-server support only ever hit the default server
+    return entry.get("sv") or "default"
+
+
+def accepted(entry):
+    return isinstance(entry.get("s"), int) and 200 <= entry["s"] < 300
+
+
+def infer_servers(entries):
+    """Server ids the bot accepted requests for, in first-seen order.
+
+    Rejected requests (bad auth or payload, unknown server) don't prove a server existed, so they are
+    left out; replayed, they are rejected again.
+    """
+    server_ids = []
+    for entry in entries:
+        if entry["p"] not in SERVER_PATHS or not accepted(entry):
+            continue
+        server_id = server_of(entry)
+        if server_id not in server_ids:
+            server_ids.append(server_id)
+    return server_ids or ["default"]
+
+
+def route_of(path: str):
+    if path.startswith("/v1/registration/"):
+        return "GET /v1/registration"
+    if path.startswith("/v1/role/"):
+        return "GET /v1/role"
+    return f"POST {path}"
+
+
+def order_key(entry):
+    path = entry["p"]
+    if path == "/v1/server-status":
+        return f"server-status:{server_of(entry)}"
+    if path == "/v1/mc-event":
+        body = entry.get("b")
+        return body.get("uuid", "") if isinstance(body, dict) else ""
+    return path.rsplit("/", 1)[-1]
+
+
+def infer_players(entries):
+    """Linked players (uuid, name, discord_id) as far as the recording reveals them."""
+    names = {}
+    linked = {}
+    for entry in entries:
+        path = entry["p"]
+        body = entry.get("b")
+        if path == "/v1/mc-event" and isinstance(body, dict) and body.get("uuid") and body.get("name"):
+            names[body["uuid"]] = body["name"]
+        elif path.startswith("/v1/registration/"):
+            response = entry.get("r") or {}
+            if response.get("registered"):
+                linked[path.rsplit("/", 1)[-1]] = int(response.get("discord_id") or 0)
+        elif path.startswith("/v1/role/") and entry.get("s") == 200:
+            linked.setdefault(path.rsplit("/", 1)[-1], 0)
+
+    players = []
+    for i, (minecraft_uuid, discord_id) in enumerate(sorted(linked.items())):
+        players.append((minecraft_uuid, names.get(minecraft_uuid, f"Unknown{i}"), discord_id or 200000000000000000 + i))
+    return players
+
+
+def expected_state(entries, server_ids):
+    """server_id -> (roster, day, time) as the recording leaves it."""
+    state = {server_id: (set(), None, None) for server_id in server_ids}
+    for entry in entries:
+        if not accepted(entry):
+            continue
+        server_id = server_of(entry)
+        if server_id not in state:
+            continue
+        roster, day, time_of_day = state[server_id]
+        body = entry.get("b")
+        if entry["p"] == "/v1/mc-event" and isinstance(body, dict):
+            name = body.get("name")
+            if not name:
+                continue
+            if body.get("event") == "join":
+                roster.add(name)
+            elif body.get("event") == "leave":
+                roster.discard(name)
+        elif entry["p"] == "/v1/server-status" and isinstance(body, dict):
+            state[server_id] = (roster, body.get("day"), body.get("time"))
+    return state
+
+
+async def replay(env: BenchEnvironment, entries, speed: float, recorder: LatencyRecorder):
+    status_mismatches = []
+
+    async def send(entry, previous):
+        if previous is not None:
+            await previous
+
+        body = entry.get("b")
+        # Mirror accepted joins and leaves into that server's fake mcstatus, as the real server would
+        minecraft = env.minecrafts.get(server_of(entry)) if accepted(entry) else None
+        if minecraft and entry["p"] == "/v1/mc-event" and isinstance(body, dict) and body.get("name"):
+            if body.get("event") == "join":
+                minecraft.online.add(body["name"])
+            elif body.get("event") == "leave":
+                minecraft.online.discard(body["name"])
+
+        headers = {"X-Server-ID": entry["sv"]} if entry.get("sv") else None
+        started = time.perf_counter()
+        try:
+            async with env.http.request(
+                entry["m"], env.base_url + entry["p"], json=body, headers=headers
+            ) as response:
+                await response.read()
+                status = response.status
+        except aiohttp.ClientError:
+            status = None
+        recorder.record(route_of(entry["p"]), time.perf_counter() - started, status is not None and status < 500)
+        if status != entry.get("s"):
+            status_mismatches.append({"path": entry["p"], "recorded": entry.get("s"), "replayed": status})
+
+    async def run_all():
+        chains = {}
+        tasks = []
+        started = time.perf_counter()
+        for entry in entries:
+            delay = entry["t"] / speed - (time.perf_counter() - started)
+            if delay > 0:
+                await asyncio.sleep(delay)
+            key = order_key(entry)
+            task = asyncio.create_task(send(entry, chains.get(key)))
+            chains[key] = task
+            tasks.append(task)
+        await asyncio.gather(*tasks)
+
+    await env.drive(run_all())
+    return status_mismatches
+
+
+def check_state(env: BenchEnvironment, entries):
+    client = env.client
+    problems = []
+
+    for server_id, (roster, day, time_of_day) in expected_state(entries, env.server_ids).items():
+        server = client.servers[server_id]
+        if server.online_players != roster:
+            problems.append(
+                f"{server_id} roster: missing {sorted(roster - server.online_players)}, "
+                f"extra {sorted(server.online_players - roster)}"
+            )
+        status = server.last_server_status
+        if day is not None and (status.get("day"), status.get("time")) != (day, time_of_day):
+            problems.append(
+                f"{server_id} game time: expected day {day} time {time_of_day}, "
+                f"got day {status.get('day')} time {status.get('time')}"
+            )
+
+        # The bench runs one panel per server
+        panel = next(panel for panel in client.panels if panel.server_ids == [server_id])
+        embed = panel.message.embed if panel.message else None
+        if embed is None:
+            problems.append(f"{server_id} panel: never rendered")
+            continue
+        fields = {field.name: field.value for field in embed.fields}
+        players_field = fields.get("Players", "")
+        if not players_field.startswith(f"👥 {len(roster)}"):
+            problems.append(f"{server_id} panel: players field {players_field!r}, expected {len(roster)} online")
+    return problems
+
+
+async def run(args):
+    entries = load_recording(args.recording)
+    if not entries:
+        raise SystemExit("Recording has no requests.")
+
+    players = infer_players(entries)
+    recorder = LatencyRecorder()
+    env = BenchEnvironment(
+        players,
+        db_latency=args.db_latency,
+        discord_latency=args.discord_latency,
+        status_latency=args.status_latency,
+        server_ids=infer_servers(entries),
+    )
+    async with env:
+        for minecraft in env.minecrafts.values():
+            minecraft.online = set()
+        started = time.perf_counter()
+        status_mismatches = await replay(env, entries, args.speed, recorder)
+        elapsed = time.perf_counter() - started
+
+        # Flush whatever the debounce still holds, then inspect the final state
+        await env.client.update_panel()
+        problems = check_state(env, entries)
+
+        counters = {
+            "requests": len(entries),
+            "replay_seconds": round(elapsed, 3),
+            "recorded_seconds": entries[-1]["t"],
+            "panel_edits": env.channel.edits,
+            "panel_sends": env.channel.sends,
+            "status_requests": sum(minecraft.status_requests for minecraft in env.minecrafts.values()),
+            "status_mismatches": len(status_mismatches),
+        }
+
+    return {
+        "config": {
+            "recording": args.recording,
+            "speed": args.speed,
+            "players": len(players),
+            "servers": env.server_ids,
+        },
+        "endpoints": recorder.summary(),
+        "counters": counters,
+        "equivalent": not problems and not status_mismatches,
+        "problems": problems,
+        "status_mismatches": status_mismatches[:50],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("recording")
+    parser.add_argument("--speed", type=float, default=1.0, help="playback speed multiplier, e.g. 1 to 100")
+    parser.add_argument("--db-latency", type=float, default=0.001)
+    parser.add_argument("--discord-latency", type=float, default=0.05)
+    parser.add_argument("--status-latency", type=float, default=0.02)
+    parser.add_argument("--json", dest="json_path", help="write machine-readable results here")
+    args = parser.parse_args()
+    if args.speed <= 0:
+        parser.error("--speed must be positive")
+
+    logging.basicConfig(level=logging.WARNING)
+    results = asyncio.run(run(args))
+    print_report(results)
+
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+
+    if results["equivalent"]:
+        print("Final state matches the recording.")
+    else:
+        print("Final state differs from the recording:")
+        for problem in results["problems"]:
+            print(f"  {problem}")
+        for mismatch in results["status_mismatches"]:
+            print(f"  {mismatch['path']}: recorded {mismatch['recorded']}, replayed {mismatch['replayed']}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -13,6 +13,7 @@ import java.util.Properties;
 public final class FileConfig {
     public static String apiBaseUrl = "https://mc-auth.marsphobos.com";
     public static String apiKey = "";
+    public static String serverId = "";
     public static int apiTimeoutSeconds = 5;
     public static int checkIntervalSeconds = 10;
     public static int messageIntervalSeconds = 30;
@@ -38,6 +39,7 @@ public final class FileConfig {
 
             apiBaseUrl = properties.getProperty("api.baseUrl", apiBaseUrl);
             apiKey = properties.getProperty("api.key", apiKey);
+            serverId = properties.getProperty("api.serverId", serverId).trim();
             apiTimeoutSeconds = parseInt(properties.getProperty("api.timeoutSeconds"), apiTimeoutSeconds);
             checkIntervalSeconds = parseInt(properties.getProperty("behavior.checkIntervalSeconds"), checkIntervalSeconds);
             messageIntervalSeconds = parseInt(properties.getProperty("behavior.messageIntervalSeconds"), messageIntervalSeconds);
@@ -46,6 +48,7 @@ public final class FileConfig {
 
             properties.setProperty("api.baseUrl", apiBaseUrl);
             properties.setProperty("api.key", apiKey);
+            properties.setProperty("api.serverId", serverId);
             properties.setProperty("api.timeoutSeconds", Integer.toString(apiTimeoutSeconds));
             properties.setProperty("behavior.checkIntervalSeconds", Integer.toString(checkIntervalSeconds));
             properties.setProperty("behavior.messageIntervalSeconds", Integer.toString(messageIntervalSeconds));
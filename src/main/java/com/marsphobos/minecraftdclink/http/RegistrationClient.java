@@ -93,6 +93,10 @@ public class RegistrationClient {
         if (apiKey != null && !apiKey.isBlank()) {
             requestBuilder.header("X-API-Key", apiKey);
         }
+        String serverId = FileConfig.serverId;
+        if (serverId != null && !serverId.isBlank()) {
+            requestBuilder.header("X-Server-ID", serverId);
+        }
 
         try {
             HttpResponse<String> response = client.send(requestBuilder.build(), HttpResponse.BodyHandlers.ofString());
@@ -130,6 +134,10 @@ public class RegistrationClient {
         if (apiKey != null && !apiKey.isBlank()) {
             requestBuilder.header("X-API-Key", apiKey);
         }
+        String serverId = FileConfig.serverId;
+        if (serverId != null && !serverId.isBlank()) {
+            requestBuilder.header("X-Server-ID", serverId);
+        }
 
         try {
             HttpResponse<String> response = client.send(requestBuilder.build(), HttpResponse.BodyHandlers.ofString());